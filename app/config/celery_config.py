@@ -1,18 +1,79 @@
+from typing import List
+
 from celery import Celery
+from kombu import Exchange, Queue
+
 from app.config.settings import settings
 
+# Tek yüklü not özetleri (create / update): ayrı worker'da, bulk import'un arkasında beklemez
+INTERACTIVE_QUEUE = "summarize.interactive"
+# bulk upload / deferred release / backfill batch flush'ları
+BULK_QUEUE = "summarize.bulk"
+# periyodik bakım task'ları (sayaç reconcile, deferred release)
+MAINTENANCE_QUEUE = "maintenance"
+
+# Redis transport'ta her priority ayrı bir list: "<queue>" (0) ve "<queue>:<p>" (1-9); 0 en yüksek
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEP = ":"
+
+
+def _queue(name: str) -> Queue:
+    # kendi exchange'i: aksi halde hepsi task_default_queue'nun routing key'ine bağlanır
+    return Queue(name, Exchange(name, type="direct"), routing_key=name)
+
+
+def queue_keys(queue: str) -> List[str]:
+    """Redis list keys holding a queue's waiting messages, one per priority step."""
+    return [queue] + [f"{queue}{PRIORITY_SEP}{step}" for step in PRIORITY_STEPS[1:]]
+
+
 celery_app = Celery(
-    "mini_crm",
+    "mini-crm",
     broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL
+    backend=settings.REDIS_URL,
+    include=["app.tasks"],
 )
 
 celery_app.conf.update(
     task_serializer="json",
-    result_serializer="json",
     accept_content=["json"],
-    timezone="Europe/Istanbul",
+    result_serializer="json",
+    timezone="UTC",
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=300,  # maksimum 5 dakika çalışabilir
+    task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
+    task_soft_time_limit=settings.CELERY_TASK_SOFT_TIME_LIMIT,
+    task_default_retry_delay=60,  # 1 minute
+    task_max_retries=3,
+    # Prevent duplicate task execution
+    task_reject_on_worker_lost=True,
+    task_acks_late=True,
+    # uzun CPU task'ları: her child sadece çalıştırdığı mesajı alır, boştaki worker'lar iş bekletmez
+    worker_prefetch_multiplier=1,
+    # --autoscale=max,min ile: Redis'te bekleyen mesajları da sayar (app/services/worker_sizing.py)
+    worker_autoscaler="app.services.worker_sizing:QueueDepthAutoscaler",
+    task_queues=[
+        # -Q verilmeyen worker bu sırayla tüketir (queue_order_strategy=priority)
+        _queue(INTERACTIVE_QUEUE),
+        _queue(BULK_QUEUE),
+        _queue(MAINTENANCE_QUEUE),
+    ],
+    # route'u olmayan task'lar interaktif kuyruğu meşgul etmesin
+    task_default_queue=BULK_QUEUE,
+    task_routes={name: route.model_dump() for name, route in settings.CELERY_TASK_ROUTES.items()},
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+        "queue_order_strategy": "priority",
+    },
+    beat_schedule={
+        "reconcile-note-status-counts": {
+            "task": "app.tasks.reconcile_note_status_counts",
+            "schedule": settings.NOTE_STATS_RECONCILE_SECONDS,
+        },
+        "release-deferred-notes": {
+            "task": "app.tasks.release_deferred_notes",
+            "schedule": settings.DEFERRED_RELEASE_SECONDS,
+        },
+    },
 )
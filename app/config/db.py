@@ -1,7 +1,87 @@
-from sqlalchemy import create_engine
+import time
+import uuid
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config.settings import settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.config.db_instrumentation import instrument_queries
+from app.config.settings import DatabasePoolProfile, settings
+from app.services.metrics_service import DB_POOL_CHECKOUT_SECONDS, DB_POOL_CONNECTIONS_IN_USE
+
+
+def async_database_url(url: str) -> str:
+    """postgresql(+psycopg2):// URL'sini asyncpg driver'ına çevirir."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+class _CheckoutTimingMixin:
+    """Pool'dan bağlantı alırken geçen bekleme süresini ölçer."""
+    metrics_profile = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(profile=self.metrics_profile).observe(time.perf_counter() - started)
+
+
+@lru_cache(maxsize=None)
+def instrumented_pool_class(base: type, profile: str) -> type:
+    # Profil adı class attribute olarak tutulur; engine.dispose() pool'u yeniden yaratsa da kaybolmaz
+    return type(f"Instrumented{base.__name__}", (_CheckoutTimingMixin, base), {"metrics_profile": profile})
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+
+def engine_options(profile_name: str, profile: DatabasePoolProfile, is_async: bool) -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # Bağlantıları pgbouncer pool'lar; transaction pooling server-side prepared statement'ları taşıyamaz
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    return {
+        "poolclass": instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, profile_name),
+        "pool_size": profile.size,
+        "max_overflow": profile.max_overflow,
+        "pool_recycle": profile.recycle,
+        "pool_pre_ping": profile.pre_ping,
+        "pool_timeout": profile.timeout,
+    }
+
+
+def instrument_pool(sync_engine: Engine, profile_name: str) -> None:
+    """Aktif (checkout edilmiş) bağlantı sayısını metric olarak tutar."""
+    in_use = DB_POOL_CONNECTIONS_IN_USE.labels(profile=profile_name)
+    event.listen(sync_engine, "checkout", lambda *args: in_use.inc())
+    event.listen(sync_engine, "checkin", lambda *args: in_use.dec())
+
+
+# Sync engine: Celery worker, Alembic ve scriptler
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    **engine_options("worker", settings.DB_POOL_WORKER, is_async=False)
+)
+instrument_pool(engine, "worker")
+instrument_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine: FastAPI request path
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    **engine_options("api", settings.DB_POOL_API, is_async=True)
+)
+instrument_pool(async_engine.sync_engine, "api")
+instrument_queries(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
@@ -0,0 +1,74 @@
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.request_context import current_endpoint
+from app.config.settings import settings
+from app.services.metrics_service import DB_QUERY_SECONDS
+
+logger = logging.getLogger("app.sql")
+
+_WHITESPACE = re.compile(r"\s+")
+# "IN ($1, $2, $3)" / "IN (%(id_1_1)s, ...)" -> "IN (...)" so expanded IN lists share one series
+_IN_LIST = re.compile(r"\bIN \((?:[^()]*?,)+[^()]*?\)", re.IGNORECASE)
+_MAX_STATEMENT_LABEL = 200
+
+
+def normalize_statement(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (...)", statement)[:_MAX_STATEMENT_LABEL]
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Bound parameter'ların değerleri değil, sadece tipleri loglanır."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    normalized = normalize_statement(statement)
+    DB_QUERY_SECONDS.labels(statement=normalized).observe(duration)
+
+    duration_ms = duration * 1000
+    if duration_ms >= settings.DB_SLOW_QUERY_MS:
+        level = logging.WARNING
+        kind = "slow query"
+    elif settings.DB_QUERY_LOG_SAMPLE_RATE and random.random() < settings.DB_QUERY_LOG_SAMPLE_RATE:
+        level = logging.INFO
+        kind = "sampled query"
+    else:
+        return
+
+    logger.log(
+        level,
+        f"{kind} {duration_ms:.1f}ms endpoint={current_endpoint.get()} "
+        f"params={parameter_shape(parameters, executemany)} sql={normalized}"
+    )
+
+
+def instrument_queries(sync_engine: Engine) -> None:
+    """
+    SQLAlchemy engine event'leri ile query instrumentation:
+    - statement başına latency histogram'ı
+    - DB_SLOW_QUERY_MS üzerindeki query'ler WARNING ile loglanır
+    - diğerlerinden DB_QUERY_LOG_SAMPLE_RATE oranında örnek INFO ile loglanır
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,23 @@
+import redis
+import redis.asyncio
+
+from app.config.settings import settings
+
+_client = None
+_async_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client (Celery ile aynı Redis)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """API (event loop) tarafı için async Redis client."""
+    global _async_client
+    if _async_client is None:
+        _async_client = redis.asyncio.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
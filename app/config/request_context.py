@@ -0,0 +1,5 @@
+from contextvars import ContextVar
+
+# O an çalışan endpoint ("GET /notes/") ya da Celery task'ı ("task:app.tasks.summarize_note_task").
+# Query log'larında çağıran yeri göstermek için kullanılır.
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="-")
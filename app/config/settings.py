@@ -1,13 +1,185 @@
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
+
+class DatabasePoolProfile(BaseModel):
+    """
+    SQLAlchemy connection pool ayarları (API ve worker için ayrı profiller).
+    Env ile override: DB_POOL_API__SIZE=20, DB_POOL_WORKER__MAX_OVERFLOW=0 ...
+    """
+    size: int = 5
+    max_overflow: int = 10
+    recycle: int = 1800  # saniye; -1 = kapalı
+    pre_ping: bool = True
+    timeout: int = 30  # pool'dan bağlantı bekleme süresi (saniye)
+
+
+class SummarizeModelTier(BaseModel):
+    """
+    Bir özetleme modeli ve yönlendirme eşiği.
+    - max_tokens: bu modele gidecek notların maksimum token sayısı (None = sınırsız)
+    - memory_mb: bellek bütçesi için tahmini model boyutu
+    """
+    model: str
+    max_tokens: Optional[int] = None
+    memory_mb: Optional[int] = None
+
+
+class RateLimit(BaseModel):
+    """
+    Token bucket: `capacity` isteğe kadar burst, sonra saniyede `refill_per_second` istek.
+    Env ile override: RATE_LIMITS='{"POST /notes/bulk": {"capacity": 5, "refill_per_second": 0.1}}'
+    """
+    capacity: int
+    refill_per_second: float
+
+
+class CeleryRoute(BaseModel):
+    """Bir task'ın kuyruğu ve kuyruk içi önceliği (0 en yüksek, 9 en düşük)."""
+    queue: str
+    priority: int = 0
+
+
 class Settings(BaseSettings):
     DATABASE_URL: str
-    JWT_SECRET_KEY: str
-    JWT_ALGORITHM: str = "HS256"
+    ASYNC_DATABASE_URL: Optional[str] = None  # boş ise DATABASE_URL'den asyncpg ile türetilir
+    DB_POOL_API: DatabasePoolProfile = DatabasePoolProfile(size=10, max_overflow=10)
+    # prefork child başına tek task çalışır; küçük pool yeterli
+    DB_POOL_WORKER: DatabasePoolProfile = DatabasePoolProfile(size=1, max_overflow=1)
+    # pgbouncer (transaction pooling) arkasında: NullPool + server-side prepared statement yok
+    DB_PGBOUNCER_MODE: bool = False
+    DB_ECHO: bool = False  # sadece lokal debug için; her statement'ı stdout'a basar
+    DB_SLOW_QUERY_MS: int = 200  # bu sürenin üzerindeki query'ler WARNING ile loglanır
+    DB_QUERY_LOG_SAMPLE_RATE: float = 0.0  # normal query'lerin loglanacak oranı (0.01 = %1)
+    JWT_SECRET_KEY: Optional[str] = None  # HS* için zorunlu
+    JWT_ALGORITHM: Literal["HS256", "HS384", "HS512", "RS256", "ES256", "EdDSA"] = "HS256"
+    # asimetrik imza (RS256 / ES256 / EdDSA): diğer servisler /.well-known/jwks.json ile lokal doğrular
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None  # PEM
+    JWT_KEY_ID: Optional[str] = None  # token header'ındaki kid
+    # sadece doğrulama için ek public key'ler (key rotation), ör: {"2025-01": "/keys/old.pub.pem"}
+    JWT_PUBLIC_KEY_FILES: Dict[str, str] = {}
+    JWT_VERIFY_CACHE_ENABLED: bool = True  # doğrulanmış token'lar exp'e kadar tekrar doğrulanmaz
+    JWT_VERIFY_CACHE_SIZE: int = 10_000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: str
 
+    # ---- Summarization ----
+    SUMMARIZE_MODEL_NAME: str = "facebook/bart-large-cnn"
+    # JSON, ör: [{"model": "sshleifer/distilbart-cnn-12-6", "max_tokens": 512, "memory_mb": 1300},
+    #           {"model": "facebook/bart-large-cnn", "memory_mb": 1700}]
+    # Boş ise tek tier: SUMMARIZE_MODEL_NAME
+    SUMMARIZE_MODEL_TIERS: List[SummarizeModelTier] = []
+    SUMMARIZE_MODEL_MEMORY_BUDGET_MB: Optional[int] = None  # worker'da aynı anda yüklü modeller için üst sınır
+    SUMMARIZE_BACKEND: Literal["torch", "torch-int8", "onnx"] = "torch"
+    SUMMARIZE_ONNX_DIR: Optional[str] = None  # ONNX export cache (default: ~/.cache/mini-crm/onnx)
+    SUMMARIZE_WARMUP: bool = True  # worker açılırken dummy inference ile modeli ısıt
+    SUMMARIZE_MAX_INPUT_TOKENS: int = 1024  # chunk penceresi (model limitini aşamaz; en az 3 x generation max_length)
+    SUMMARIZE_MAX_CHUNKS: int = 8  # uzun notlarda latency'yi sınırlamak için chunk üst sınırı
+    SUMMARIZE_BATCH_SIZE: int = 16  # tek forward pass'te özetlenecek maksimum not
+    SUMMARIZE_BATCH_WINDOW_MS: int = 200  # batch dolmazsa bu süre sonunda flush
+
+    # ---- Summary cache (içerik hash'i + model + parametreler) ----
+    SUMMARY_CACHE_ENABLED: bool = True
+    SUMMARY_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    SUMMARY_CACHE_LOCAL_SIZE: int = 1024  # process içi LRU kapasitesi
+
+    # ---- Password hashing ----
+    PASSWORD_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"  # yeni hash'ler; argon2 için argon2-cffi gerekir
+    BCRYPT_ROUNDS: int = 12  # değişirse eski hash'ler login'de yeniden hash'lenir
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KB: int = 65536
+    PASSWORD_HASH_WORKERS: int = 2  # API process'i başına hash process'i
+    PASSWORD_HASH_MAX_PENDING: int = 64  # kuyruk dolunca signup/login 503 döner
+
+    # ---- Auth principal cache (user id -> id, role) ----
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_REDIS: bool = True  # process'ler arası paylaşımlı katman
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300  # Redis kaydı
+    # process içi kayıt; başka process'teki invalidation en geç bu kadar sonra görülür
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_LOCAL_SIZE: int = 10_000
+
+    # ---- Bulk notes ----
+    BULK_MAX_NOTES: int = 50_000  # tek POST /notes/bulk isteğinde (JSON veya NDJSON) maksimum not
+    BULK_INSERT_CHUNK_SIZE: int = 1000  # multi-row INSERT .. RETURNING başına satır
+
+    # ---- Rate limiting (Redis token bucket, kullanıcı + endpoint başına) ----
+    RATE_LIMIT_ENABLED: bool = True
+    # "METHOD path" -> bucket; listede olmayan endpoint'ler sınırlanmaz. Token'sız istekler IP bazlı sayılır.
+    RATE_LIMITS: Dict[str, RateLimit] = {
+        "POST /notes/": RateLimit(capacity=60, refill_per_second=1),
+        "POST /notes/bulk": RateLimit(capacity=5, refill_per_second=0.05),
+        "POST /auth/login": RateLimit(capacity=10, refill_per_second=0.5),
+        "POST /auth/signup": RateLimit(capacity=5, refill_per_second=0.1),
+    }
+    # kullanıcı bazlı override, ör: {"<user id>": {"POST /notes/bulk": {"capacity": 50, "refill_per_second": 1}}}
+    RATE_LIMIT_USER_OVERRIDES: Dict[str, Dict[str, RateLimit]] = {}
+
+    # ---- Admission control (özetleme kuyruğu derinliği) ----
+    # Kuyruktaki not sayısı bunu aşarsa yeni notlar kabul edilir ama 'deferred' olarak bekletilir (0 = kapalı)
+    SUMMARIZE_BACKLOG_MAX: int = 5000
+    # deferred notlar backlog bunun altına inince kuyruğa alınır (histerezis)
+    SUMMARIZE_BACKLOG_RESUME: int = 2500
+    SUMMARIZE_BACKLOG_CHECK_MS: int = 1000  # backlog'un arka planda Redis'ten okunma aralığı
+    DEFERRED_RELEASE_SECONDS: int = 30  # deferred notları kuyruğa alan beat task'ının periyodu
+    DEFERRED_RELEASE_PER_USER: int = 200  # tek turda kullanıcı başına (bir kullanıcı kuyruğu tek başına doldurmasın)
+
+    # ---- Export ----
+    EXPORT_BATCH_SIZE: int = 1000  # server-side cursor'dan tek seferde çekilen satır (bellek sabit kalır)
+
+    # ---- Note stats ----
+    # True: /notes/stats herkes için note_status_counts sayaçlarından okunur (admin her zaman sayaçtan okur)
+    NOTE_STATS_USE_COUNTERS: bool = False
+    NOTE_STATS_RECONCILE_SECONDS: int = 3600  # sayaç sapmalarını düzelten beat task'ının periyodu
+
+    # ---- Celery ----
+    CELERY_TASK_TIME_LIMIT: int = 300  # saniye; aşılırsa child process öldürülür
+    CELERY_TASK_SOFT_TIME_LIMIT: int = 270  # SoftTimeLimitExceeded: task notları failed işaretleyip çıkabilir
+    # task adı -> kuyruk + öncelik; env ile override:
+    # CELERY_TASK_ROUTES='{"app.tasks.flush_summarize_batch": {"queue": "summarize.bulk", "priority": 3}}'
+    CELERY_TASK_ROUTES: Dict[str, CeleryRoute] = {
+        "app.tasks.summarize_note_task": CeleryRoute(queue="summarize.interactive", priority=0),
+        "app.tasks.flush_summarize_batch": CeleryRoute(queue="summarize.bulk", priority=5),
+        "app.tasks.reconcile_note_status_counts": CeleryRoute(queue="maintenance"),
+        "app.tasks.release_deferred_notes": CeleryRoute(queue="maintenance"),
+        # backfill.py: yeni notların arkasında, en düşük öncelik
+        "app.tasks.backfill_summaries": CeleryRoute(queue="summarize.bulk", priority=9),
+    }
+    WORKER_PRELOAD_MODELS: bool = True  # sadece maintenance kuyruğunu tüketen worker'da false
+    # modeller fork'tan önce parent'ta yüklenir: child'lar ağırlık sayfalarını copy-on-write paylaşır
+    # (onnx backend'inde etkisiz; ONNX Runtime session'ları fork-safe değil)
+    WORKER_PRELOAD_IN_PARENT: bool = True
+
+    # ---- Worker sizing (python celery_worker.py worker ...) ----
+    # child sayısı (autoscale min..max) ve child başına thread, cgroup CPU + bellek limitinden hesaplanır
+    WORKER_AUTOSIZE: bool = True
+    WORKER_MIN_CONCURRENCY: int = 1  # autoscale alt sınırı
+    WORKER_MAX_CONCURRENCY: Optional[int] = None  # None = CPU ve belleğin izin verdiği kadar
+    WORKER_THREADS_PER_CHILD: Optional[int] = None  # torch intra-op thread; None = çekirdekler / max child
+    WORKER_MODEL_MEMORY_MB: int = 1700  # tier'larda memory_mb yoksa child başına model tahmini (bart-large-cnn fp32)
+    WORKER_CHILD_OVERHEAD_MB: int = 300  # model dışı child RSS'i (interpreter, torch runtime)
+    WORKER_MEMORY_RESERVE_MB: int = 512  # parent process + sistem payı
+
+    # ---- Outbox dispatcher (python outbox_dispatcher.py) ----
+    OUTBOX_BATCH_SIZE: int = 500  # FOR UPDATE SKIP LOCKED ile tek turda alınan satır
+    OUTBOX_POLL_MS: int = 100  # outbox boşken (batch dolmadıysa) tekrar bakma aralığı
+    OUTBOX_METRICS_PORT: Optional[int] = None  # set edilirse dispatcher /metrics portu açar
+
+    # ---- Backfill (python backfill.py) ----
+    BACKFILL_BATCH_SIZE: int = 16  # task mesajı başına not (worker'da tek padded batch)
+    BACKFILL_RATE: float = 20.0  # kuyruğa alma hızı sınırı, not/saniye
+    BACKFILL_MAX_BACKLOG: Optional[int] = None  # özetleme backlog'u bunun üstündeyse bekler; None = SUMMARIZE_BACKLOG_RESUME
+    BACKFILL_WINDOW: int = 5000  # server-side cursor başına satır (transaction'lar kısa kalsın)
+    BACKFILL_REPORT_SECONDS: int = 10  # ilerleme / ETA satırı aralığı
+
+    # ---- Metrics ----
+    WORKER_METRICS_PORT: Optional[int] = None  # set edilirse worker /metrics portu açar
+    WORKER_MEMORY_REPORT_SECONDS: int = 30  # child USS / PSS / shared bellek gauge'larının güncellenme aralığı
+
     class Config:
         env_file = ".env"
+        env_nested_delimiter = "__"
 
 settings = Settings()
@@ -1,23 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.schemas.auth_schema import SignupRequest, LoginRequest, TokenResponse
 from app.models.user_model import User
 from app.dependencies import get_db
-from app.services.token_service import create_access_token
+from app.services.password_service import PasswordHasherBusy, hash_password, verify_and_update
+from app.services.token_service import create_access_token, jwks
 from app.config.settings import settings
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
+# standart path prefix'siz: /.well-known/jwks.json
+jwks_router = APIRouter(tags=["Auth"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Too many concurrent logins, retry shortly", headers={"Retry-After": "1"})
 
 
 @router.post(
@@ -26,16 +26,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     summary="Yeni kullanıcı kaydı",
     description="Email ve şifre ile yeni kullanıcı oluşturur. Başarılı olursa access token döner."
 )
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == payload.email).first()
+async def signup(payload: SignupRequest, db: AsyncSession = Depends(get_db)):
+    existing_user = await db.scalar(select(User).where(User.email == payload.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
+    # hash beklenirken DB bağlantısını tutma: login fırtınası havuzu tüketmesin
+    await db.commit()
 
-    hashed_pw = hash_password(payload.password)
+    # bcrypt/argon2 CPU-bound: ayrı process pool'da (thread pool'u da meşgul etmesin)
+    try:
+        hashed_pw = await hash_password(payload.password)
+    except PasswordHasherBusy:
+        raise _busy()
     new_user = User(email=payload.email, password=hashed_pw, role="user")
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # aynı email ile eşzamanlı kayıt: kontrol ile insert arasında hash süresi kadar pencere var
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="User already exists")
+    await db.refresh(new_user)
 
     access_token = create_access_token(
         data={"sub": str(new_user.id)},
@@ -50,13 +61,35 @@ def signup(payload: SignupRequest, db: Session = Depends(get_db)):
     summary="Kullanıcı girişi",
     description="Kayıtlı bir kullanıcı email & şifre ile giriş yapar. Başarılı olursa access token döner."
 )
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == payload.email))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    await db.commit()  # expire_on_commit=False: user kullanılabilir kalır, bağlantı havuza döner
+
+    try:
+        valid, new_hash = await verify_and_update(payload.password, user.password)
+    except PasswordHasherBusy:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    # BCRYPT_ROUNDS / PASSWORD_SCHEME değiştiyse hash şeffafça güncellenir
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+
     access_token = create_access_token(
         data={"sub": str(user.id)},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@jwks_router.get(
+    "/.well-known/jwks.json",
+    summary="Token doğrulama public key'leri (JWKS)",
+    description="Asimetrik imza (RS256 / ES256 / EdDSA) açıksa diğer servisler token'ları bu key'lerle lokal doğrular. HS256'da boş döner."
+)
+def get_jwks():
+    return jwks()
@@ -1,92 +1,289 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Literal
 from uuid import UUID
 import logging
 
-from app.schemas.note_schema import NoteCreate, NoteResponse, NoteUpdate, NoteBulkCreate, NoteBulkResponse, NoteStats
+from app.schemas.note_schema import (
+    NoteCreate, NoteResponse, NoteUpdate, NoteBulkCreate, NoteBulkResponse, NotePage, NoteSearchPage, NoteSearchResult, NoteStats
+)
 from app.models.note_model import Note
 from app.dependencies import get_db, get_current_user
-from app.models.user_model import User
-from app.tasks import summarize_note_task
+from app.services.principal_service import Principal
+from app.config.celery_config import INTERACTIVE_QUEUE
+from app.config.settings import settings
+from app.services.admission_service import admission_controller
+from app.services.bulk_note_service import NDJSON_CONTENT_TYPES, BulkLimitExceeded, create_notes, iter_items, iter_ndjson
+from app.services.cache_service import content_hash
+from app.services.note_stats_service import counter_counts_query, counts_by_status, exact_counts_query
+from app.services.export_service import MEDIA_TYPES, export_query, stream_export
+from app.services.outbox_service import outbox_insert
+from app.services.pagination_service import keyset_paginate, page_result
+from app.services.search_service import MIN_TRIGRAM_QUERY_LENGTH, SEARCHES, decode_search_cursor, encode_search_cursor
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
+# Stable keyset order, backed by ix_notes_user_id_created_at_id / ix_notes_created_at_id
+PAGE_ORDER = (Note.created_at, Note.id)
+
+
+async def _fetch_page(db: AsyncSession, query, cursor: str | None, limit: int) -> NotePage:
+    try:
+        query = keyset_paginate(query, PAGE_ORDER, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = (await db.scalars(query)).all()
+    items, next_cursor = page_result(rows, PAGE_ORDER, limit)
+    return NotePage(items=items, next_cursor=next_cursor)
+
 
 @router.post(
     "/",
     response_model=NoteResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Yeni not oluştur",
-    description="Kullanıcı yeni bir not oluşturur. Not başlangıçta `queued` durumunda olur ve özetleme kuyruğa alınır."
+    description="""
+    Kullanıcı yeni bir not oluşturur. Not başlangıçta `queued` durumunda olur ve özetleme kuyruğa alınır.
+    Özetleme kuyruğu doluysa not `deferred` olarak kaydedilir ve kuyruk boşaldıkça otomatik olarak kuyruğa alınır.
+    """
 )
-def create_note(payload: NoteCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_note(payload: NoteCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # admission control: kuyruk çok derinse not kabul edilir ama hemen kuyruğa alınmaz
+    enqueue = admission_controller.admit(1) == 1
     note = Note(
         user_id=current_user.id,
         title=payload.title,
         content=payload.content,
-        status="queued"
+        status="queued" if enqueue else "deferred"
     )
     db.add(note)
-    db.commit()
-    db.refresh(note)
-
-    # Queue the summarization task
-    print(f"🔍 DEBUG: Attempting to queue task for note {note.id}")
-    try:
-        task_result = summarize_note_task.delay(note.id)
-        print(f"✅ DEBUG: Task queued successfully for note {note.id}: {task_result.id}")
-    except Exception as e:
-        # If queuing fails, update note status to failed
-        print(f"❌ DEBUG: Exception occurred: {e}")
-        note.status = "failed"
-        note.error_message = f"Failed to queue task: {str(e)}"
-        db.commit()
-        raise  # Re-raise to see the error
-
+    if enqueue:
+        # outbox satırı notla aynı transaction'da; broker'a outbox dispatcher yayınlar
+        await db.flush()
+        await db.execute(outbox_insert([note.id], INTERACTIVE_QUEUE))
+    await db.commit()
+    await db.refresh(note)
     return note
 
 
 @router.get(
     "/",
-    response_model=list[NoteResponse],
-    summary="Notları listele (pagination + filtreleme destekli)",
+    response_model=NotePage,
+    summary="Notları listele (cursor pagination + filtreleme destekli)",
     description="""
     - Admin tüm notları görebilir.
     - Normal kullanıcı sadece kendi notlarını görebilir.
+    - Notlar en yeniden eskiye `(created_at, id)` sırasıyla döner.
     - Opsiyonel `status` parametresi ile filtreleme yapılabilir.
-    - Opsiyonel `limit` parametresi ile sonuç sayısı sınırlandırılabilir.
+    - Opsiyonel `limit` parametresi ile sayfa boyutu sınırlandırılabilir.
+    - Sonraki sayfa için cevaptaki `next_cursor` değeri `cursor` parametresi olarak gönderilir.
     """
 )
-def get_notes(
+async def get_notes(
     status: str | None = Query(default=None, description="Filtrelemek için not durumu (pending, completed, failed)"),
     limit: int = Query(default=10, ge=1, le=100, description="Döndürülecek maksimum sonuç sayısı"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: str | None = Query(default=None, description="Önceki sayfanın `next_cursor` değeri"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    query = db.query(Note)
+    query = select(Note)
 
     # rol bazlı filtre
     if current_user.role != "admin":
-        query = query.filter(Note.user_id == current_user.id)
+        query = query.where(Note.user_id == current_user.id)
 
     # status filtresi
     if status:
-        query = query.filter(Note.status == status)
+        query = query.where(Note.status == status)
+
+    return await _fetch_page(db, query, cursor, limit)
+
+
+@router.get(
+    "/stats",
+    response_model=NoteStats,
+    summary="Not istatistiklerini getir",
+    description="Kullanıcının not istatistiklerini döner. Admin tüm notların istatistiklerini görebilir."
+)
+async def get_note_stats(db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    is_admin = current_user.role == "admin"
+    user_id = None if is_admin else current_user.id
+
+    # Admin (tüm tablo) her zaman sayaçlardan; kullanıcı bazlı sayım tek GROUP BY
+    if is_admin or settings.NOTE_STATS_USE_COUNTERS:
+        query = counter_counts_query(user_id)
+    else:
+        query = exact_counts_query(user_id)
+    rows = (await db.execute(query)).all()
+    counts = counts_by_status(rows)
+
+    return NoteStats(
+        total_notes=sum(counts.values()),
+        queued_notes=counts["queued"],
+        deferred_notes=counts["deferred"],
+        pending_notes=counts["pending"],
+        processing_notes=counts["processing"],
+        completed_notes=counts["completed"],
+        failed_notes=counts["failed"]
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=NoteBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Toplu not oluştur",
+    description="""
+    Birden fazla notu aynı anda oluşturur. Notlar başlangıçta `queued` durumunda olur ve batch halinde özetlenir.
+    - Özetleme kuyruğuna sığmayan notlar `deferred` olarak kaydedilir ve kuyruk boşaldıkça sırayla kuyruğa alınır.
+    - `application/json`: `{"notes": [{"title": ..., "content": ...}, ...]}`
+    - `application/x-ndjson`: her satırda bir not; büyük yüklemeler stream edilerek okunur.
+    - Hatalı öğeler isteği düşürmez; `errors` içinde sıra numarasıyla döner.
+    """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {
+                    "type": "object",
+                    "properties": {"notes": {"type": "array", "items": NoteCreate.model_json_schema()}},
+                    "required": ["notes"],
+                }},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_bulk_notes(request: Request, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = iter_ndjson(request.stream())
+    else:
+        try:
+            payload = NoteBulkCreate.model_validate(await request.json())
+        except (ValueError, ValidationError):
+            raise HTTPException(status_code=422, detail="Body must be {\"notes\": [...]} or NDJSON")
+        items = iter_items(payload.notes)
+
+    # multi-row INSERT .. RETURNING (+ queued notların outbox satırları), tek transaction; refresh gerekmez
+    # status sayaçları en sonda tek upsert ile artırılır: sayaç satırları yalnızca commit anında kilitli kalır
+    try:
+        created_notes, errors = await create_notes(db, current_user.id, items, admit=admission_controller.admit)
+    except BulkLimitExceeded as e:
+        await db.rollback()
+        raise HTTPException(status_code=413, detail=str(e))
+    await db.commit()
+
+    return NoteBulkResponse(
+        created_count=len(created_notes),
+        failed_count=len(errors),
+        deferred_count=sum(note.status == "deferred" for note in created_notes),
+        notes=created_notes,
+        errors=errors
+    )
+
+
+@router.get(
+    "/search",
+    response_model=NoteSearchPage,
+    summary="Notları ara",
+    description="""
+    - Başlık, içerik ve özette full-text arama (`websearch_to_tsquery`: "tırnak içinde ifade", or, -hariç).
+    - Sonuçlar alaka düzeyine (`ts_rank`) göre sıralanır, `snippet` eşleşen kısmı `<mark>` ile işaretler.
+    - Full-text eşleşme yoksa substring / yazım hatası toleranslı (pg_trgm) aramaya düşer; `mode` hangisinin kullanıldığını söyler.
+    - Admin tüm notlarda arayabilir. Sonraki sayfa için `next_cursor` değeri `cursor` olarak gönderilir.
+    """
+)
+async def search_notes(
+    q: str = Query(..., min_length=1, description="Aranacak anahtar kelime"),
+    limit: int = Query(default=10, ge=1, le=100, description="Döndürülecek maksimum sonuç sayısı"),
+    cursor: str | None = Query(default=None, description="Önceki sayfanın `next_cursor` değeri"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    query = select(Note)
+
+    # Role-based filtering
+    if current_user.role != "admin":
+        query = query.where(Note.user_id == current_user.id)
+
+    q = q.strip()
+    try:
+        mode, cursor = decode_search_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    notes = query.limit(limit).all()
-    return notes
+    page = await _search_page(db, query, q, mode, cursor, limit)
+    # İlk sayfada full-text sonuç yoksa trigram fallback
+    if mode == "fts" and cursor is None and not page.items and len(q) >= MIN_TRIGRAM_QUERY_LENGTH:
+        page = await _search_page(db, query, q, "trgm", None, limit)
+    return page
+
+
+async def _search_page(db: AsyncSession, query, q: str, mode: str, cursor: str | None, limit: int) -> NoteSearchPage:
+    query, order = SEARCHES[mode](query, q)
+    try:
+        query = keyset_paginate(query, order, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = (await db.execute(query)).all()
+    rows, next_cursor = page_result(rows, order, limit, sort_key=lambda row: (row.rank, row.Note.created_at, row.Note.id))
+    items = [
+        NoteSearchResult(**NoteResponse.model_validate(note).model_dump(), rank=rank, snippet=snippet)
+        for note, rank, snippet in rows
+    ]
+    return NoteSearchPage(items=items, next_cursor=encode_search_cursor(mode, next_cursor), mode=mode)
 
 
+@router.get(
+    "/export",
+    summary="Notları dışa aktar (NDJSON / CSV stream)",
+    description="""
+    - Notları server-side cursor ile okuyup satır satır stream eder; bellek kullanımı satır sayısından bağımsızdır.
+    - Admin tüm notları, normal kullanıcı sadece kendi notlarını dışa aktarır.
+    - Opsiyonel `status` ve `created_from` (dahil) / `created_to` (hariç) filtreleri.
+    - `gzip=true` ile çıktı gzip dosyası olarak döner.
+    """,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}, "application/gzip": {}}}},
+)
+async def export_notes(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson", description="Çıktı formatı"),
+    status: str | None = Query(default=None, description="Filtrelemek için not durumu"),
+    created_from: datetime | None = Query(default=None, description="Bu tarihten (dahil) itibaren oluşturulan notlar"),
+    created_to: datetime | None = Query(default=None, description="Bu tarihten (hariç) önce oluşturulan notlar"),
+    gzip: bool = Query(default=False, description="Çıktıyı gzip ile sıkıştır"),
+    current_user: Principal = Depends(get_current_user)
+):
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be earlier than created_to")
+
+    # rol bazlı filtre (GET /notes ile aynı)
+    user_id = None if current_user.role == "admin" else current_user.id
+    query = export_query(user_id, status, created_from, created_to)
+
+    filename = f"notes.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(query, format, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Sabit path'ler (/stats, /bulk, /search, /export) yukarıda kalmalı; aksi halde /{note_id} onları yakalar.
 @router.get(
     "/{note_id}",
     response_model=NoteResponse,
     summary="Tek not getir",
     description="ID'si verilen notu döner. Normal kullanıcı sadece kendi notunu görebilir."
 )
-def get_note_by_id(note_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    note = db.query(Note).filter(Note.id == note_id).first()
+async def get_note_by_id(note_id: UUID, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    note = await db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     if current_user.role != "admin" and note.user_id != current_user.id:
@@ -100,17 +297,24 @@ def get_note_by_id(note_id: UUID, db: Session = Depends(get_db), current_user: U
     summary="Not güncelle",
     description="Kullanıcı kendi notunu güncelleyebilir. Admin tüm notları güncelleyebilir."
 )
-def update_note(note_id: UUID, payload: NoteUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    note = db.query(Note).filter(Note.id == note_id).first()
+async def update_note(note_id: UUID, payload: NoteUpdate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    note = await db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     if current_user.role != "admin" and note.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    # Re-summarize only when the normalized content actually changed
+    content_changed = bool(payload.content) and content_hash(payload.content) != content_hash(note.content)
+
     note.title = payload.title or note.title
     note.content = payload.content or note.content
-    db.commit()
-    db.refresh(note)
+    if content_changed:
+        note.status = "queued"
+        note.error = None
+        await db.execute(outbox_insert([note.id], INTERACTIVE_QUEUE))
+    await db.commit()
+    await db.refresh(note)
     return note
 
 
@@ -120,106 +324,13 @@ def update_note(note_id: UUID, payload: NoteUpdate, db: Session = Depends(get_db
     summary="Not sil",
     description="Kullanıcı kendi notunu silebilir. Admin tüm notları silebilir."
 )
-def delete_note(note_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    note = db.query(Note).filter(Note.id == note_id).first()
+async def delete_note(note_id: UUID, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    note = await db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     if current_user.role != "admin" and note.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    db.delete(note)
-    db.commit()
+    await db.delete(note)
+    await db.commit()
     return None
-
-
-@router.get(
-    "/stats",
-    response_model=NoteStats,
-    summary="Not istatistiklerini getir",
-    description="Kullanıcının not istatistiklerini döner. Admin tüm notların istatistiklerini görebilir."
-)
-def get_note_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    query = db.query(Note)
-
-    # Role-based filtering
-    if current_user.role != "admin":
-        query = query.filter(Note.user_id == current_user.id)
-
-    # Get total count
-    total_notes = query.count()
-
-    # Get counts by status
-    pending_notes = query.filter(Note.status == "pending").count()
-    processing_notes = query.filter(Note.status == "processing").count()
-    completed_notes = query.filter(Note.status == "completed").count()
-    failed_notes = query.filter(Note.status == "failed").count()
-
-    return NoteStats(
-        total_notes=total_notes,
-        pending_notes=pending_notes,
-        processing_notes=processing_notes,
-        completed_notes=completed_notes,
-        failed_notes=failed_notes
-    )
-
-
-@router.post(
-    "/bulk",
-    response_model=NoteBulkResponse,
-    status_code=status.HTTP_201_CREATED,
-    summary="Toplu not oluştur",
-    description="Birden fazla notu aynı anda oluşturur. Tüm notlar başlangıçta 'pending' durumunda olur."
-)
-def create_bulk_notes(payload: NoteBulkCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    created_notes = []
-
-    for note_data in payload.notes:
-        note = Note(
-            user_id=current_user.id,
-            title=note_data.title,
-            content=note_data.content,
-            status="pending"
-        )
-        db.add(note)
-        created_notes.append(note)
-
-    db.commit()
-
-    # Refresh all notes to get their IDs
-    for note in created_notes:
-        db.refresh(note)
-
-    return NoteBulkResponse(
-        created_count=len(created_notes),
-        notes=created_notes
-    )
-
-
-@router.get(
-    "/search",
-    response_model=list[NoteResponse],
-    summary="Notları ara",
-    description="Başlık ve içerikte anahtar kelime arar. Admin tüm notlarda arayabilir."
-)
-def search_notes(
-    q: str = Query(..., min_length=1, description="Aranacak anahtar kelime"),
-    limit: int = Query(default=10, ge=1, le=100, description="Döndürülecek maksimum sonuç sayısı"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(Note)
-
-    # Role-based filtering
-    if current_user.role != "admin":
-        query = query.filter(Note.user_id == current_user.id)
-
-    # Search in title and content (case insensitive)
-    search_filter = (
-        Note.title.ilike(f"%{q}%") |
-        Note.content.ilike(f"%{q}%")
-    )
-
-    notes = query.filter(search_filter).limit(limit).all()
-    return notes
-
-
@@ -1,32 +1,49 @@
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.principal_service import Principal, principal_cache
 from app.services.token_service import verify_access_token
-from app.config.db import SessionLocal
+from app.config.db import AsyncSessionLocal
 from app.models.user_model import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    JWT'deki kullanıcıyı (id, role) principal olarak döner.
+    Principal cache'te ise DB'ye hiç gidilmez; session bağlantıyı ancak sorguda alır.
+    """
     payload = verify_access_token(token)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
-    
-    user = db.query(User).filter(User.id == payload.get("sub")).first()
-    if not user:
+    try:
+        user_id = UUID(str(payload.get("sub")))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+
+    principal = await principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    # DB okumasından önce: arada commit edilen bir rol değişikliği / silme eski principal'ı geri yazdırmaz
+    fill = await principal_cache.begin_fill(user_id)
+    row = (await db.execute(select(User.id, User.role).where(User.id == user_id))).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    
-    return user
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
-    if current_user.role != "admin":
+    principal = Principal(id=row.id, role=row.role)
+    await principal_cache.set(principal, fill)
+    return principal
+
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
     return current_user
@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from app.routes.routes import router as api_router
-from app.config.db import Base, engine
+from app.config.db import Base, async_engine
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.middlewares.request_context_middleware import RequestContextMiddleware
+from app.services.admission_service import admission_controller
+from app.services.metrics_service import metrics_asgi_app
+from app.services.password_service import shutdown_pool as shutdown_password_pool
 
 app = FastAPI(
     title="Mini CRM API",
@@ -20,15 +25,34 @@ app = FastAPI(
 
 
 @app.on_event("startup")
-def startup():
+async def startup():
     # Migration (alembic) kullanılmadığı durumda tabloyu otomatik yaratır.
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     print("✅ Veritabanına bağlandı.")
+    # özetleme backlog'u arka planda okunur; not oluşturma Redis'i beklemez
+    admission_controller.start()
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await admission_controller.stop()
+    await async_engine.dispose()
+    shutdown_password_pool()
+
+
+# query log'larında çağıran endpoint'i göstermek için
+app.add_middleware(RequestContextMiddleware)
+
+# en dışta: limit aşan istek route'a hiç ulaşmasın
+app.add_middleware(RateLimitMiddleware)
+
 # tüm route'ları ekle
 app.include_router(api_router)
 
+# Prometheus metrics
+app.mount("/metrics", metrics_asgi_app())
+
 
 @app.get("/", tags=["Health"])
 def root():
@@ -0,0 +1,50 @@
+from starlette.responses import JSONResponse
+
+from app.services.rate_limit_service import RateLimiter, rate_limiter
+from app.services.token_service import verify_access_token
+
+
+class RateLimitMiddleware:
+    """
+    RATE_LIMITS'te tanımlı endpoint'ler için token bucket kontrolü; limit aşılırsa 429 + Retry-After.
+    Çağıran, Bearer token'daki kullanıcıdır (doğrulama cache'li, DB'ye gitmez);
+    token yoksa ya da geçersizse istemci IP'si. Token'ın kendisini endpoint yine doğrular.
+    Saf ASGI middleware: limitsiz endpoint'lerde Redis'e hiç gidilmez.
+    """
+
+    def __init__(self, app, limiter: RateLimiter = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            return await self.app(scope, receive, send)
+
+        endpoint = f"{scope['method']} {scope['path']}"
+        user_id = _user_id(scope)
+        limit = self.limiter.limit_for(endpoint, user_id)
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        caller = f"user:{user_id}" if user_id else f"ip:{scope['client'][0] if scope.get('client') else '-'}"
+        decision = await self.limiter.check(endpoint, caller, limit)
+        if decision is not None and not decision.allowed:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": decision.retry_after_header},
+            )
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+
+def _user_id(scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            payload = verify_access_token(token)
+            return payload.get("sub") if payload else None
+    return None
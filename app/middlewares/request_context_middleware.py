@@ -0,0 +1,21 @@
+from app.config.request_context import current_endpoint
+
+
+class RequestContextMiddleware:
+    """
+    Her HTTP isteği için `current_endpoint` context değişkenini set eder.
+    Saf ASGI middleware: BaseHTTPMiddleware'in ek maliyeti yok.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = current_endpoint.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_endpoint.reset(token)
@@ -1,24 +1,71 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Column, Computed, String, DateTime, ForeignKey, Index, Text, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import column_property, deferred
 from sqlalchemy.sql import func
 import uuid
 
 from app.config.db import Base
 
+# 'simple': notlar Türkçe/İngilizce karışık; dil bazlı stemming/stopword yok
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'C')"
+)
+
 class Note(Base):
     """
     Not tablosu.
     - Kullanıcıların oluşturduğu notları saklar.
     - 'summary' alanı Celery worker tarafından doldurulur.
-    - 'status' alanı: pending | processing | completed | failed
+    - 'summary_model' alanı özeti hangi modelin ürettiğini tutar.
+    - 'summary_content_hash' / 'summary_version' özetin kaynağını tutar (backfill.py).
+    - 'status' alanı: queued | deferred | pending | processing | completed | failed
+      (deferred: özetleme kuyruğu doluyken kabul edildi, kuyruk boşalınca queued olur)
     """
     __tablename__ = "notes"
+    __table_args__ = (
+        # GET /notes keyset pagination: kullanıcı bazlı ve admin (tüm notlar)
+        Index("ix_notes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notes_created_at_id", "created_at", "id"),
+        # status filtresi + stats sayımları (kullanıcı bazlı)
+        Index("ix_notes_user_id_status_created_at_id", "user_id", "status", "created_at", "id"),
+        # kuyruktaki / işlenen notlar (küçük partial index)
+        Index(
+            "ix_notes_active_status_created_at_id",
+            "status", "created_at", "id",
+            postgresql_where=text("status IN ('queued', 'pending', 'processing')"),
+        ),
+        # deferred notların kullanıcı bazlı (round-robin) kuyruğa alınması
+        Index(
+            "ix_notes_deferred_user_id_created_at_id",
+            "user_id", "created_at", "id",
+            postgresql_where=text("status = 'deferred'"),
+        ),
+        # /notes/search: full-text (websearch_to_tsquery) ve pg_trgm fallback (substring / typo)
+        Index("ix_notes_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_notes_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_notes_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     summary = Column(Text, nullable=True)
-    status = Column(String, default="pending", nullable=False)
+    summary_model = Column(String, nullable=True)  # özeti üreten model (audit)
+    # özetin hangi içerik ve model sürümünden (model + generation parametreleri) üretildiği;
+    # ikisi de tutuyorsa backfill notu yeniden özetlemez
+    summary_content_hash = Column(String, nullable=True)
+    summary_version = Column(String, nullable=True)
+    # active_history: eski değer her zaman bilinsin (note_status_counts sayaçları için)
+    status = column_property(Column(String, default="pending", nullable=False), active_history=True)
     error = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Postgres'in hesapladığı arama vektörü; listelerde yüklenmesin diye deferred
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+
+# create_all (migration'sız kurulum) notes tablosunu yaratırken trigram index'lerinden önce extension'ı açsın
+event.listen(Note.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
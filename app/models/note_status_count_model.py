@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.config.db import Base
+
+class NoteStatusCount(Base):
+    """
+    Kullanıcı + status bazında not sayaçları.
+    - Note insert / status değişimi / delete ile aynı transaction'da güncellenir
+      (app/services/note_stats_service.py).
+    - /notes/stats için tabloyu taramadan sabit maliyetli okuma sağlar.
+    - Sapmalar periyodik reconcile task'ı ile düzeltilir.
+    """
+    __tablename__ = "note_status_counts"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Identity, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.config.db import Base
+
+class SummarizeOutbox(Base):
+    """
+    Özetleme için transactional outbox.
+    - Not oluşturma / güncelleme / bulk / deferred release ile aynı transaction'da yazılır:
+      commit edilen her queued notun kuyruğa alınması kayıt altındadır, istek broker'ı beklemez.
+    - outbox_dispatcher.py satırları FOR UPDATE SKIP LOCKED ile batch halinde alır,
+      broker'a yayınlar ve siler (app/services/outbox_service.py).
+    - 'queue': hedef Celery kuyruğu (summarize.interactive | summarize.bulk).
+    """
+    __tablename__ = "summarize_outbox"
+
+    # id sırası = yazılma sırası; dispatcher en eskiden başlar
+    id = Column(BigInteger, Identity(), primary_key=True)
+    note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, index=True)
+    queue = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
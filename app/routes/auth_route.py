@@ -3,3 +3,4 @@ from app.controllers import auth_controller
 
 router = APIRouter()
 router.include_router(auth_controller.router)
+router.include_router(auth_controller.jwks_router)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, constr
-from typing import Optional, List
+from typing import Any, Optional, List
 from uuid import UUID
+from datetime import datetime
 
 class NoteCreate(BaseModel):
     title: constr(min_length=3)  # type: ignore
@@ -33,25 +34,81 @@ class NoteResponse(BaseModel):
     title: str
     content: str
     summary: Optional[str] = None
+    summary_model: Optional[str] = None
     status: str
     error: Optional[str] = None
+    created_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
         json_schema_extra = {
             "example": {
                 "id": "550e8400-e29b-41d4-a716-446655440000",
                 "title": "Toplantı Notları",
                 "content": "Bugün müşteri ile ürün lansman planını konuştuk.",
                 "summary": "Ürün lansmanı planlandı.",
+                "summary_model": "facebook/bart-large-cnn",
                 "status": "completed",
-                "error": None
+                "error": None,
+                "created_at": "2025-09-14T18:00:00+00:00"
+            }
+        }
+
+
+class NotePage(BaseModel):
+    items: List[NoteResponse]
+    next_cursor: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "id": "550e8400-e29b-41d4-a716-446655440000",
+                        "title": "Toplantı Notları",
+                        "content": "Bugün müşteri ile ürün lansman planını konuştuk.",
+                        "status": "completed",
+                        "created_at": "2025-09-14T18:00:00+00:00"
+                    }
+                ],
+                "next_cursor": "WyIyMDI1LTA5LTE0VDE4OjAwOjAwKzAwOjAwIiwiNTUwZTg0MDAiXQ"
+            }
+        }
+
+
+class NoteSearchResult(NoteResponse):
+    rank: float
+    snippet: Optional[str] = None  # eşleşen kelimeler <mark>...</mark> ile işaretli
+
+
+class NoteSearchPage(BaseModel):
+    items: List[NoteSearchResult]
+    next_cursor: Optional[str] = None
+    mode: str  # fts (full-text) | trgm (substring / yazım hatası fallback)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "id": "550e8400-e29b-41d4-a716-446655440000",
+                        "title": "Toplantı Notları",
+                        "content": "Bugün müşteri ile ürün lansman planını konuştuk.",
+                        "status": "completed",
+                        "created_at": "2025-09-14T18:00:00+00:00",
+                        "rank": 0.0607927,
+                        "snippet": "Bugün müşteri ile ürün <mark>lansman</mark> planını konuştuk."
+                    }
+                ],
+                "next_cursor": "fts.WzAuMDYwNzkyNywiMjAyNS0wOS0xNFQxODowMDowMCswMDowMCIsIjU1MGU4NDAwIl0",
+                "mode": "fts"
             }
         }
 
 
 class NoteBulkCreate(BaseModel):
-    notes: List[NoteCreate]
+    # öğeler tek tek doğrulanır; hatalı öğe tüm isteği düşürmez (NoteBulkResponse.errors)
+    notes: List[Any]
 
     class Config:
         json_schema_extra = {
@@ -70,21 +127,34 @@ class NoteBulkCreate(BaseModel):
         }
 
 
+class NoteBulkError(BaseModel):
+    index: int  # istekteki sırası (NDJSON'da satır sırası, boş satırlar hariç)
+    errors: List[str]
+
+
 class NoteBulkResponse(BaseModel):
     created_count: int
+    failed_count: int = 0
+    deferred_count: int = 0  # kabul edildi, özetleme kuyruğu boşalınca kuyruğa alınacak
     notes: List[NoteResponse]
+    errors: List[NoteBulkError] = []
 
     class Config:
         json_schema_extra = {
             "example": {
-                "created_count": 2,
+                "created_count": 1,
+                "failed_count": 1,
+                "deferred_count": 0,
                 "notes": [
                     {
                         "id": "550e8400-e29b-41d4-a716-446655440000",
                         "title": "İlk Not",
                         "content": "Bu ilk notun içeriği",
-                        "status": "pending"
+                        "status": "queued"
                     }
+                ],
+                "errors": [
+                    {"index": 1, "errors": ["content: String should have at least 10 characters"]}
                 ]
             }
         }
@@ -92,6 +162,8 @@ class NoteBulkResponse(BaseModel):
 
 class NoteStats(BaseModel):
     total_notes: int
+    queued_notes: int
+    deferred_notes: int
     pending_notes: int
     processing_notes: int
     completed_notes: int
@@ -101,7 +173,9 @@ class NoteStats(BaseModel):
         json_schema_extra = {
             "example": {
                 "total_notes": 25,
-                "pending_notes": 3,
+                "queued_notes": 2,
+                "deferred_notes": 0,
+                "pending_notes": 1,
                 "processing_notes": 1,
                 "completed_notes": 20,
                 "failed_notes": 1
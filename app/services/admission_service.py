@@ -0,0 +1,171 @@
+"""
+Queue-depth admission control for summarization.
+
+New notes are always accepted, but only as many as fit under
+SUMMARIZE_BACKLOG_MAX are enqueued right away; the rest are stored as
+`deferred`. The release task puts deferred notes back on the queue once the
+backlog drops below SUMMARIZE_BACKLOG_RESUME, a bounded number per user per
+round, so one tenant's bulk import cannot hold everyone else's notes back.
+"""
+import asyncio
+import logging
+from collections import Counter as Tally
+from typing import Callable, List, Optional
+from uuid import UUID
+
+from prometheus_client import Counter
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config.celery_config import BULK_QUEUE, INTERACTIVE_QUEUE, queue_keys
+from app.config.redis_client import get_async_redis, get_redis
+from app.config.settings import settings
+from app.models.note_model import Note
+from app.services.note_stats_service import apply_status_deltas
+from app.services.outbox_service import outbox_insert
+from app.services.summarize_batcher import BUFFER_KEY
+
+logger = logging.getLogger(__name__)
+
+# özetleme kuyruklarının tüm priority list'leri
+SUMMARIZE_QUEUE_KEYS = (*queue_keys(INTERACTIVE_QUEUE), *queue_keys(BULK_QUEUE))
+
+NOTE_ADMISSIONS = Counter(
+    "notes_admission_total",
+    "New notes by admission decision",
+    ["decision"],
+)
+
+
+def backlog_pipeline(redis):
+    """
+    Approximate summarization backlog in notes: single-note tasks waiting in
+    the summarize queues plus note IDs buffered for batch flushes (each
+    waiting flush message adds one more; close enough for admission).
+    """
+    pipe = redis.pipeline(transaction=False)
+    for key in (*SUMMARIZE_QUEUE_KEYS, BUFFER_KEY):
+        pipe.llen(key)
+    return pipe
+
+
+class AdmissionController:
+    """
+    The backlog is read from Redis by a background task every `check_ms`
+    (`start()` / `stop()` on app startup / shutdown), so admitting a note never
+    waits on the broker. In between readings, notes admitted by this process
+    are added to the last reading. Redis errors keep the last reading (fail open).
+    """
+
+    def __init__(
+        self,
+        async_redis_factory: Callable,
+        redis_factory: Callable,
+        max_backlog: int = None,
+        resume_backlog: int = None,
+        check_ms: int = None,
+    ):
+        self._async_redis_factory = async_redis_factory
+        self._redis_factory = redis_factory
+        self.max_backlog = settings.SUMMARIZE_BACKLOG_MAX if max_backlog is None else max_backlog
+        self.resume_backlog = settings.SUMMARIZE_BACKLOG_RESUME if resume_backlog is None else resume_backlog
+        self.check_ms = settings.SUMMARIZE_BACKLOG_CHECK_MS if check_ms is None else check_ms
+        self._backlog = 0
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> int:
+        try:
+            self._backlog = sum(await backlog_pipeline(self._async_redis_factory()).execute())
+        except Exception as e:
+            logger.warning(f"Could not read summarization backlog: {e}")
+        return self._backlog
+
+    async def _refresh_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.check_ms / 1000)
+
+    def start(self):
+        """Start the background backlog reader (no-op when admission control is off)."""
+        if self.max_backlog and self._refresher is None:
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresher is None:
+            return
+        self._refresher.cancel()
+        try:
+            await self._refresher
+        except asyncio.CancelledError:
+            pass
+        self._refresher = None
+
+    def admit(self, count: int) -> int:
+        """How many of `count` new notes may be enqueued now; the rest are deferred."""
+        if not self.max_backlog:
+            admitted = count
+        else:
+            admitted = max(0, min(count, self.max_backlog - self._backlog))
+            self._backlog += admitted
+        NOTE_ADMISSIONS.labels(decision="queued").inc(admitted)
+        NOTE_ADMISSIONS.labels(decision="deferred").inc(count - admitted)
+        return admitted
+
+    def release_capacity(self) -> int:
+        """Sync (worker): how many deferred notes may be enqueued now."""
+        backlog = sum(backlog_pipeline(self._redis_factory()).execute())
+        if backlog >= self.resume_backlog:
+            return 0
+        return max(0, (self.max_backlog or self.resume_backlog) - backlog)
+
+
+admission_controller = AdmissionController(async_redis_factory=get_async_redis, redis_factory=get_redis)
+
+
+def _set_status(db: Session, note_ids, old: str, new: str) -> List[UUID]:
+    """Bulk status change; bypasses the flush hooks, so counters are bumped here."""
+    rows = db.execute(
+        update(Note)
+        .where(Note.id.in_(note_ids), Note.status == old)
+        .values(status=new)
+        .returning(Note.id, Note.user_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    per_user = Tally(row.user_id for row in rows)
+    deltas = {}
+    for user_id, count in per_user.items():
+        deltas[(user_id, old)] = -count
+        deltas[(user_id, new)] = count
+    apply_status_deltas(db.connection(), deltas)
+    return [row.id for row in rows]
+
+
+def release_deferred(db: Session, limit: int, per_user: int = None) -> List[UUID]:
+    """
+    Flip up to `limit` deferred notes to queued, oldest first but round-robin
+    across users (at most `per_user` each), write their outbox rows (bulk
+    queue) and commit. Uses ix_notes_deferred_user_id_created_at_id.
+    """
+    if limit <= 0:
+        return []
+    per_user = per_user or settings.DEFERRED_RELEASE_PER_USER
+    ranked = (
+        select(
+            Note.id,
+            Note.created_at,
+            func.row_number().over(partition_by=Note.user_id, order_by=(Note.created_at, Note.id)).label("rank"),
+        )
+        .where(Note.status == "deferred")
+        .subquery()
+    )
+    candidates = (
+        select(ranked.c.id)
+        .where(ranked.c.rank <= per_user)
+        .order_by(ranked.c.rank, ranked.c.created_at)
+        .limit(limit)
+    )
+    released = _set_status(db, candidates, "deferred", "queued")
+    if released:
+        db.execute(outbox_insert(released, BULK_QUEUE))
+    db.commit()
+    return released
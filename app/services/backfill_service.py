@@ -0,0 +1,213 @@
+"""
+Re-summarization backfill after a model or generation parameter change.
+
+backfill.py streams the IDs of the notes matching a BackfillFilter through a
+server-side cursor in (created_at, id) order and enqueues them in batches as
+backfill_summaries tasks (bulk queue, lowest priority). Enqueueing is
+throttled to a notes/second rate and pauses while the summarization backlog
+is high, so new notes keep priority. The last enqueued (created_at, id) is
+checkpointed in Redis after every batch; an interrupted run resumes there.
+The worker skips notes whose summary already matches their content hash and
+the current model version, so re-enqueued batches cost no inference.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter
+from sqlalchemy import func, select, tuple_
+
+from app.config.settings import settings
+from app.models.note_model import Note
+from app.services.pagination_service import decode_cursor, encode_cursor
+from app.services.summarize_service import summary_version
+
+logger = logging.getLogger(__name__)
+
+# queued / pending / processing / deferred notlar zaten normal yoldan özetlenecek
+BACKFILL_STATUSES = ("completed", "failed")
+ORDER = (Note.created_at, Note.id)
+CHECKPOINT_PREFIX = "backfill:checkpoint:"
+
+BACKFILL_NOTES = Counter(
+    "summarize_backfill_notes_total",
+    "Notes handled by backfill_summaries, by result",
+    ["result"],
+)
+
+
+def current_versions() -> List[str]:
+    """summary_version of every configured model tier."""
+    models = [tier.model for tier in settings.SUMMARIZE_MODEL_TIERS] or [settings.SUMMARIZE_MODEL_NAME]
+    return [summary_version(model) for model in models]
+
+
+@dataclass(frozen=True)
+class BackfillFilter:
+    statuses: Tuple[str, ...] = BACKFILL_STATUSES
+    created_from: Optional[datetime] = None  # dahil
+    created_to: Optional[datetime] = None  # hariç
+    user_id: Optional[UUID] = None
+    models: Tuple[str, ...] = ()  # summary_model IN (...)
+    # False: özeti zaten güncel bir model sürümüyle üretilmiş notlar SQL'de elenir;
+    # tier eşikleri değiştiyse True (worker her notu içerik hash'i + sürümle kontrol eder)
+    include_current: bool = False
+
+    @property
+    def name(self) -> str:
+        """Checkpoint name: the same filter (and model config) resumes the same run."""
+        signature = json.dumps({**asdict(self), "versions": current_versions()}, sort_keys=True, default=str)
+        return hashlib.sha256(signature.encode("utf-8")).hexdigest()[:12]
+
+    def query(self, columns=ORDER):
+        query = select(*columns).where(Note.status.in_(self.statuses))
+        if self.created_from:
+            query = query.where(Note.created_at >= self.created_from)
+        if self.created_to:
+            query = query.where(Note.created_at < self.created_to)
+        if self.user_id:
+            query = query.where(Note.user_id == self.user_id)
+        if self.models:
+            query = query.where(Note.summary_model.in_(self.models))
+        if not self.include_current:
+            query = query.where(
+                Note.summary_version.is_(None) | Note.summary_version.not_in(current_versions())
+            )
+        return query
+
+
+class BackfillCheckpoint:
+    """Last enqueued (created_at, id) and the enqueued count of a run, in a Redis hash."""
+
+    def __init__(self, redis_factory: Callable, name: str):
+        self._redis_factory = redis_factory
+        self.key = CHECKPOINT_PREFIX + name
+
+    def load(self) -> Tuple[Optional[list], int]:
+        data = self._redis_factory().hgetall(self.key)
+        if not data:
+            return None, 0
+        return decode_cursor(data["cursor"], ORDER), int(data["enqueued"])
+
+    def save(self, last_row, enqueued: int) -> None:
+        self._redis_factory().hset(self.key, mapping={"cursor": encode_cursor(last_row), "enqueued": enqueued})
+
+    def clear(self) -> None:
+        self._redis_factory().delete(self.key)
+
+
+class BackfillRunner:
+    """
+    Enqueues the notes of a filter. `enqueue(note_ids)` publishes one batch and
+    `backlog()` returns the current summarization backlog; both are injected so
+    this module does not import Celery tasks.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        enqueue: Callable[[List[str]], None],
+        backlog: Callable[[], int],
+        checkpoint: BackfillCheckpoint,
+        batch_size: int = None,
+        rate: float = None,
+        max_backlog: int = None,
+        window: int = None,
+    ):
+        self._session_factory = session_factory
+        self._enqueue = enqueue
+        self._backlog = backlog
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size or settings.BACKFILL_BATCH_SIZE
+        self.rate = rate or settings.BACKFILL_RATE
+        self.max_backlog = max_backlog or settings.BACKFILL_MAX_BACKLOG or settings.SUMMARIZE_BACKLOG_RESUME
+        self.window = window or settings.BACKFILL_WINDOW
+
+    def remaining(self, backfill_filter: BackfillFilter, after: Optional[list]) -> int:
+        query = backfill_filter.query(columns=(func.count(),))
+        if after:
+            query = query.where(tuple_(*ORDER) > tuple_(*after))
+        with self._session_factory() as db:
+            return db.scalar(query)
+
+    def _wait_for_backlog(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                if self._backlog() < self.max_backlog:
+                    return
+            except Exception as e:
+                logger.warning(f"Could not read summarization backlog: {e}")
+                return
+            stop.wait(1)
+
+    def _fetch_window(self, backfill_filter: BackfillFilter, after: Optional[list]) -> List[tuple]:
+        """
+        The next `window` (created_at, id) pairs after `after`, read through a
+        server-side cursor. The transaction ends before anything is enqueued,
+        so throttling and backlog waits never hold a snapshot open.
+        """
+        query = backfill_filter.query().order_by(*ORDER).limit(self.window)
+        if after:
+            query = query.where(tuple_(*ORDER) > tuple_(*after))
+        with self._session_factory() as db:
+            result = db.execute(query.execution_options(yield_per=self.batch_size))
+            return [tuple(row) for row in result]
+
+    def run(self, backfill_filter: BackfillFilter, stop: threading.Event) -> int:
+        """Enqueue until the filter is exhausted or `stop` is set. Returns the total enqueued by the run."""
+        after, enqueued = self.checkpoint.load()
+        total = enqueued + self.remaining(backfill_filter, after)
+        if after:
+            logger.info(f"Resuming backfill {self.checkpoint.key}: {enqueued} already enqueued")
+        logger.info(f"Backfill: {total - enqueued} notes to enqueue at {self.rate:g} notes/s")
+
+        started = time.monotonic()
+        reported = started
+        enqueued_now = 0
+        exhausted = False
+        while not exhausted and not stop.is_set():
+            window = self._fetch_window(backfill_filter, after)
+            for offset in range(0, len(window), self.batch_size):
+                self._wait_for_backlog(stop)
+                if stop.is_set():
+                    break
+                rows = window[offset:offset + self.batch_size]
+                self._enqueue([str(note_id) for _, note_id in rows])
+                after = list(rows[-1])
+                enqueued += len(rows)
+                enqueued_now += len(rows)
+                self.checkpoint.save(after, enqueued)
+
+                now = time.monotonic()
+                if now - reported >= settings.BACKFILL_REPORT_SECONDS:
+                    reported = now
+                    self._report(enqueued, total, enqueued_now / (now - started))
+                # hız sınırı: bu çalıştırmada kuyruğa alınan / geçen süre <= rate
+                stop.wait(max(0.0, enqueued_now / self.rate - (time.monotonic() - started)))
+            exhausted = len(window) < self.window and not stop.is_set()
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self._report(enqueued, total, enqueued_now / elapsed)
+        if exhausted:
+            self.checkpoint.clear()
+            logger.info(f"Backfill finished: {enqueued} notes enqueued")
+        else:
+            logger.info(f"Backfill stopped at {enqueued}/{total}; run the same command again to resume")
+        return enqueued
+
+    @staticmethod
+    def _report(enqueued: int, total: int, rate: float) -> None:
+        left = max(total - enqueued, 0)
+        if rate:
+            seconds = int(left / rate)
+            eta = f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        else:
+            eta = "?"
+        percent = enqueued / total * 100 if total else 100
+        logger.info(f"Backfill: {enqueued}/{total} enqueued ({percent:.1f}%), {rate:.1f} notes/s, ETA {eta}")
@@ -0,0 +1,146 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.celery_config import BULK_QUEUE
+from app.config.settings import settings
+from app.models.note_model import Note
+from app.schemas.note_schema import NoteBulkError, NoteCreate
+from app.services.note_stats_service import status_deltas_upsert
+from app.services.outbox_service import outbox_insert
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+BULK_NOTE_ITEMS = Counter(
+    "notes_bulk_items_total",
+    "Notes received by POST /notes/bulk, by result",
+    ["result"],
+)
+
+
+class BulkLimitExceeded(Exception):
+    pass
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse an NDJSON request body as it streams in, one object per line.
+    Malformed lines are yielded as ValueError instances instead of raising,
+    so one bad line does not fail the whole upload.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+async def iter_items(items: Iterable) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+def validate_item(index: int, item: Any) -> Tuple[Optional[NoteCreate], Optional[NoteBulkError]]:
+    if isinstance(item, Exception):
+        return None, NoteBulkError(index=index, errors=[str(item)])
+    try:
+        return NoteCreate.model_validate(item), None
+    except ValidationError as e:
+        messages = [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+            for error in e.errors(include_url=False)
+        ]
+        return None, NoteBulkError(index=index, errors=messages)
+
+
+async def insert_notes(
+    db: AsyncSession, user_id: UUID, notes: List[NoteCreate], deltas: Dict[tuple, int], status: str = "queued"
+) -> List[Note]:
+    """
+    Multi-row INSERT .. RETURNING for a chunk of validated notes.
+    ORM bulk insert skips the flush hooks, so the status counter deltas are
+    added to `deltas`; the caller applies them with `status_deltas_upsert`
+    once, right before committing.
+    """
+    if not notes:
+        return []
+    rows = [
+        {"user_id": user_id, "title": note.title, "content": note.content, "status": status}
+        for note in notes
+    ]
+    created = (await db.scalars(insert(Note).returning(Note, sort_by_parameter_order=True), rows)).all()
+    deltas[(user_id, status)] = deltas.get((user_id, status), 0) + len(created)
+    return list(created)
+
+
+async def create_notes(
+    db: AsyncSession,
+    user_id: UUID,
+    items: AsyncIterator[Any],
+    admit: Optional[Callable[[int], int]] = None,
+) -> Tuple[List[Note], List[NoteBulkError]]:
+    """
+    Validate items one by one and insert the valid ones in chunks of
+    BULK_INSERT_CHUNK_SIZE while the items are still arriving.
+    `admit(n)` says how many notes of a chunk may be queued; the rest are
+    inserted as deferred. Queued notes get their outbox rows (bulk queue).
+    Everything is inserted in the caller's transaction; the caller commits.
+    The status counters are bumped once at the end, after the last chunk:
+    the upload may stream for a long time and the (user_id, status) counter
+    rows stay locked from the upsert until the commit, blocking every other
+    write of the same user.
+    """
+    deltas: Dict[tuple, int] = {}
+
+    async def insert_chunk(notes: List[NoteCreate]) -> List[Note]:
+        queued = len(notes) if admit is None or not notes else admit(len(notes))
+        queued_notes = await insert_notes(db, user_id, notes[:queued], deltas)
+        if queued_notes:
+            await db.execute(outbox_insert([note.id for note in queued_notes], BULK_QUEUE))
+        return queued_notes + await insert_notes(db, user_id, notes[queued:], deltas, status="deferred")
+
+    created: List[Note] = []
+    errors: List[NoteBulkError] = []
+    pending: List[NoteCreate] = []
+    index = -1
+
+    async for item in items:
+        index += 1
+        if index >= settings.BULK_MAX_NOTES:
+            raise BulkLimitExceeded(f"At most {settings.BULK_MAX_NOTES} notes per request")
+        note, error = validate_item(index, item)
+        if error:
+            errors.append(error)
+            continue
+        pending.append(note)
+        if len(pending) >= settings.BULK_INSERT_CHUNK_SIZE:
+            created.extend(await insert_chunk(pending))
+            pending = []
+
+    created.extend(await insert_chunk(pending))
+    stmt = status_deltas_upsert(deltas)
+    if stmt is not None:
+        await db.execute(stmt)
+
+    BULK_NOTE_ITEMS.labels(result="created").inc(len(created))
+    BULK_NOTE_ITEMS.labels(result="invalid").inc(len(errors))
+    return created, errors
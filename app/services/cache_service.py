@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_REQUESTS = Counter(
+    "summary_cache_requests_total",
+    "Summary cache lookups by layer and result",
+    ["layer", "result"],
+)
+
+
+class TTLLRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+    - Size-based eviction: least recently used entry is dropped past `maxsize`.
+    - Time-based eviction: expired entries are dropped lazily on access.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def normalize_content(content: str) -> str:
+    """Unicode NFC + collapsed whitespace, so cosmetic edits hit the same entry."""
+    return " ".join(unicodedata.normalize("NFC", content).split())
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Summary cache keyed by normalized content + model + generation parameters.
+    In-process LRU in front of Redis; Redis entries expire after the TTL.
+    Cache errors never fail a task, they are treated as misses.
+    """
+
+    PREFIX = "summary:v1:"
+
+    def __init__(
+        self,
+        redis_factory: Callable,
+        maxsize: int = None,
+        ttl: int = None,
+        enabled: bool = None,
+    ):
+        self._redis_factory = redis_factory
+        self.ttl = ttl or settings.SUMMARY_CACHE_TTL_SECONDS
+        self.enabled = settings.SUMMARY_CACHE_ENABLED if enabled is None else enabled
+        self.local = TTLLRUCache(maxsize or settings.SUMMARY_CACHE_LOCAL_SIZE, self.ttl)
+
+    @staticmethod
+    def key(content: str, model_name: str, params: dict) -> str:
+        signature = json.dumps({"model": model_name, "params": params}, sort_keys=True)
+        digest = hashlib.sha256(f"{content_hash(content)}:{signature}".encode("utf-8")).hexdigest()
+        return SummaryCache.PREFIX + digest
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        summary = self.local.get(key)
+        if summary is not None:
+            SUMMARY_CACHE_REQUESTS.labels(layer="local", result="hit").inc()
+            return summary
+        SUMMARY_CACHE_REQUESTS.labels(layer="local", result="miss").inc()
+
+        try:
+            summary = self._redis_factory().get(key)
+        except Exception as e:
+            logger.warning(f"Summary cache lookup failed: {e}")
+            summary = None
+
+        if summary is None:
+            SUMMARY_CACHE_REQUESTS.labels(layer="redis", result="miss").inc()
+            return None
+
+        SUMMARY_CACHE_REQUESTS.labels(layer="redis", result="hit").inc()
+        self.local.set(key, summary)
+        return summary
+
+    def set(self, key: str, summary: str) -> None:
+        if not self.enabled or not summary:
+            return
+        self.local.set(key, summary)
+        try:
+            self._redis_factory().set(key, summary, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Summary cache write failed: {e}")
@@ -0,0 +1,67 @@
+import logging
+import re
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Sentence end (. ! ? …) followed by whitespace, or a blank line
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+# Rough upper bound of characters per token, used to avoid tokenizing
+# text that could never fit into the chunk budget anyway
+MAX_CHARS_PER_TOKEN = 8
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def chunk_by_tokens(text: str, tokenizer, max_tokens: int, max_chunks: int) -> List[str]:
+    """
+    Split text on sentence boundaries into windows of at most `max_tokens`
+    model tokens (special tokens included).
+    - Sentences longer than a window are split on token boundaries.
+    - At most `max_chunks` chunks are returned; the rest of the text is dropped
+      so that summarization latency stays bounded.
+    """
+    budget = max_tokens - tokenizer.num_special_tokens_to_add()
+    text = text[:max_tokens * max_chunks * MAX_CHARS_PER_TOKEN]
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    truncated = False
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(" ".join(current))
+        current, current_tokens = [], 0
+
+    for sentence, ids in zip(sentences, token_ids):
+        if len(chunks) >= max_chunks:
+            truncated = True
+            break
+
+        if len(ids) > budget:
+            flush()
+            for start in range(0, len(ids), budget):
+                chunks.append(tokenizer.decode(ids[start:start + budget]).strip())
+            continue
+
+        # +1 for the joining space
+        if current and current_tokens + len(ids) + 1 > budget:
+            flush()
+        current.append(sentence)
+        current_tokens += len(ids) + (1 if current_tokens else 0)
+
+    flush()
+
+    if truncated or len(chunks) > max_chunks:
+        logger.info(f"Text exceeds {max_chunks} chunks of {max_tokens} tokens, the remainder is dropped")
+    return chunks[:max_chunks]
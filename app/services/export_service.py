@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.config.db import AsyncSessionLocal
+from app.config.settings import settings
+from app.models.note_model import Note
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (
+    Note.id, Note.user_id, Note.title, Note.content, Note.summary,
+    Note.summary_model, Note.status, Note.error, Note.created_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query(
+    user_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    Plain column select (no ORM objects) in (created_at, id) order, so the
+    existing keyset indexes serve it without a sort.
+    `created_from` is inclusive, `created_to` exclusive.
+    """
+    query = select(*EXPORT_COLUMNS)
+    if user_id is not None:
+        query = query.where(Note.user_id == user_id)
+    if status:
+        query = query.where(Note.status == status)
+    if created_from:
+        query = query.where(Note.created_at >= created_from)
+    if created_to:
+        query = query.where(Note.created_at < created_to)
+    return query.order_by(Note.created_at, Note.id)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_ndjson(rows: Sequence) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Sequence, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(query, fmt: str, gzip: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream the query result through a server-side cursor, EXPORT_BATCH_SIZE
+    rows at a time, encoded (and optionally gzipped) per batch.
+    Opens its own session: the request-scoped one is already closed by the
+    time a StreamingResponse body is iterated.
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # 31: gzip header/trailer
+    exported = 0
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            header = encode_csv([], header=True)
+            yield compressor.compress(header) if compressor else header
+
+        async for rows in result.partitions():
+            chunk = encode_csv(rows) if fmt == "csv" else encode_ndjson(rows)
+            exported += len(rows)
+            if compressor:
+                chunk = compressor.compress(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
+    logger.info(f"Export finished: {exported} rows ({fmt}{', gzip' if gzip else ''})")
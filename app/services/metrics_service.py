@@ -0,0 +1,183 @@
+from prometheus_client import CollectorRegistry, Gauge, Histogram, make_asgi_app, start_http_server, multiprocess
+from contextlib import contextmanager
+from typing import Dict
+import json
+import logging
+import os
+import resource
+import time
+
+logger = logging.getLogger(__name__)
+
+# ---- Summarization model ----
+MODEL_LOAD_SECONDS = Gauge(
+    "summarize_model_load_seconds",
+    "Time spent loading the summarization model in this process",
+    ["model"],
+    multiprocess_mode="liveall",
+)
+MODEL_WARMUP_SECONDS = Gauge(
+    "summarize_model_warmup_seconds",
+    "Time spent on the warm-up inference after loading the model",
+    ["model"],
+    multiprocess_mode="liveall",
+)
+MODEL_MEMORY_BYTES = Gauge(
+    "summarize_model_memory_bytes",
+    "Resident memory added to this process by loading the model",
+    ["model"],
+    multiprocess_mode="liveall",
+)
+WORKER_PROCESS_MEMORY_BYTES = Gauge(
+    "worker_process_memory_bytes",
+    "Memory of a worker process from smaps_rollup: uss (private), pss (proportional), "
+    "shared (pages shared with the parent / other children, e.g. copy-on-write model weights)",
+    ["kind"],
+    multiprocess_mode="liveall",
+)
+
+# ---- Summarization task ----
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SUMMARIZE_STAGE_SECONDS = Histogram(
+    "summarize_stage_seconds",
+    "Latency of each summarization stage per task run",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+SUMMARIZE_TOTAL_SECONDS = Histogram(
+    "summarize_total_seconds",
+    "End-to-end latency of a summarization task",
+    ["task"],
+    buckets=STAGE_BUCKETS,
+)
+
+
+class StageTimer:
+    """
+    Accumulates durations per stage (db_fetch, status_update, tokenize,
+    generate, write_back ...) for one unit of work.
+    Call `observe()` once at the end to record histograms and a structured log line.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
+
+    def observe(self, task: str, **fields) -> Dict[str, float]:
+        total = time.perf_counter() - self.started
+        for name, seconds in self.durations.items():
+            SUMMARIZE_STAGE_SECONDS.labels(stage=name).observe(seconds)
+        SUMMARIZE_TOTAL_SECONDS.labels(task=task).observe(total)
+
+        logger.info(json.dumps({
+            "event": "summarize_timing",
+            "task": task,
+            **{key: str(value) for key, value in fields.items()},
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in self.durations.items()},
+            "total_ms": round(total * 1000, 2),
+        }))
+        return self.durations
+
+# ---- Database pool ----
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["profile"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ["profile"],
+    multiprocess_mode="livesum",
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Latency of SQL statements by normalized statement",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10),
+)
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of the current process.
+    Falls back to peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_memory(pid="self") -> Dict[str, int]:
+    """
+    Unique vs. shared memory of a process in bytes, from /proc/<pid>/smaps_rollup:
+    rss, pss, uss (Private_Clean + Private_Dirty) and shared (Shared_Clean + Shared_Dirty).
+    Empty where smaps_rollup is not available (non-Linux, kernel < 4.14).
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def record_process_memory() -> Dict[str, int]:
+    """Export this process' uss / pss / shared memory and return the numbers."""
+    memory = process_memory()
+    for kind in ("uss", "pss", "shared"):
+        if kind in memory:
+            WORKER_PROCESS_MEMORY_BYTES.labels(kind=kind).set(memory[kind])
+    return memory
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Expose /metrics on the given port.
+    Under Celery prefork, PROMETHEUS_MULTIPROC_DIR must be set so that
+    the metrics of every child process are aggregated.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+    logger.info(f"Metrics server listening on port {port}")
+
+
+def metrics_asgi_app():
+    """ASGI app serving /metrics for the API (multiprocess-aware)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_asgi_app(registry=registry)
+    return make_asgi_app()
+
+
+def mark_process_dead(pid: int) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
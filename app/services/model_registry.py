@@ -0,0 +1,196 @@
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from transformers import AutoTokenizer
+
+from app.config.settings import SummarizeModelTier, settings
+from app.services.metrics_service import (
+    MODEL_LOAD_SECONDS,
+    MODEL_MEMORY_BYTES,
+    MODEL_WARMUP_SECONDS,
+    current_rss_bytes,
+)
+from app.services.summarize_service import SummarizeService
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = (
+    "The customer called to discuss the upcoming product launch. "
+    "We agreed on the delivery schedule and the pricing for the first quarter. "
+    "A follow-up meeting was planned for next week to finalize the contract."
+)
+
+# Rough upper bound of characters per token, used to cap routing tokenization
+MAX_CHARS_PER_TOKEN = 8
+
+
+class ModelRegistry:
+    """
+    Process-level registry for the summarization models.
+    - Models are loaded once per worker process, not once per task.
+    - Notes are routed to a model tier by token count (short notes -> small model).
+    - A memory budget limits how many models are resident at the same time;
+      the least recently used model is evicted to make room.
+    - Load time, warm-up time and memory growth are exported as metrics.
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[List[SummarizeModelTier]] = None,
+        memory_budget_mb: Optional[int] = None,
+    ):
+        tiers = tiers or settings.SUMMARIZE_MODEL_TIERS or [
+            SummarizeModelTier(model=settings.SUMMARIZE_MODEL_NAME)
+        ]
+        # Smallest threshold first, unbounded tier last
+        self.tiers = sorted(tiers, key=lambda tier: (tier.max_tokens is None, tier.max_tokens or 0))
+        self.memory_budget_mb = memory_budget_mb or settings.SUMMARIZE_MODEL_MEMORY_BUDGET_MB
+        self._services: "OrderedDict[str, SummarizeService]" = OrderedDict()
+        self._memory_mb: Dict[str, float] = {}
+        self._router_tokenizer = None
+        self._lock = threading.RLock()
+
+    @property
+    def default_model(self) -> str:
+        return self.tiers[-1].model
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        return (model_name or self.default_model) in self._services
+
+    def _tier(self, model_name: str) -> Optional[SummarizeModelTier]:
+        return next((tier for tier in self.tiers if tier.model == model_name), None)
+
+    def _evict_for(self, needed_mb: float) -> None:
+        """Drop least recently used models until `needed_mb` fits into the budget."""
+        if not self.memory_budget_mb:
+            return
+        while self._services and sum(self._memory_mb.values()) + needed_mb > self.memory_budget_mb:
+            model_name, _ = self._services.popitem(last=False)
+            self._memory_mb.pop(model_name, None)
+            MODEL_MEMORY_BYTES.labels(model=model_name).set(0)
+            logger.info(f"Evicted summarization model {model_name} to stay within the memory budget")
+        gc.collect()
+
+    def load(self, model_name: Optional[str] = None, warmup: Optional[bool] = None) -> SummarizeService:
+        """
+        Load (and optionally warm up) a model. Safe to call more than once.
+        """
+        model_name = model_name or self.default_model
+        with self._lock:
+            if model_name in self._services:
+                self._services.move_to_end(model_name)
+                return self._services[model_name]
+
+            tier = self._tier(model_name)
+            self._evict_for(tier.memory_mb if tier and tier.memory_mb else 0)
+
+            rss_before = current_rss_bytes()
+            started = time.perf_counter()
+            service = SummarizeService(model_name=model_name)
+            load_seconds = time.perf_counter() - started
+            memory_bytes = max(current_rss_bytes() - rss_before, 0)
+
+            MODEL_LOAD_SECONDS.labels(model=model_name).set(load_seconds)
+            MODEL_MEMORY_BYTES.labels(model=model_name).set(memory_bytes)
+            logger.info(
+                f"Summarization model {model_name} loaded in {load_seconds:.2f}s "
+                f"(+{memory_bytes / 1024 / 1024:.0f} MB RSS)"
+            )
+
+            if settings.SUMMARIZE_WARMUP if warmup is None else warmup:
+                self._warmup(service)
+
+            self._services[model_name] = service
+            self._memory_mb[model_name] = (
+                tier.memory_mb if tier and tier.memory_mb else memory_bytes / 1024 / 1024
+            )
+            return service
+
+    def load_all(self, warmup: Optional[bool] = None) -> None:
+        """Preload tiers (largest first) as long as they fit into the memory budget."""
+        loaded_mb = 0.0
+        for tier in reversed(self.tiers):
+            if self.memory_budget_mb and tier.memory_mb and loaded_mb + tier.memory_mb > self.memory_budget_mb:
+                continue
+            self.load(tier.model, warmup=warmup)
+            loaded_mb += self._memory_mb.get(tier.model, 0)
+            if self.memory_budget_mb and loaded_mb >= self.memory_budget_mb:
+                break
+
+    def _warmup(self, service: SummarizeService) -> None:
+        started = time.perf_counter()
+        service.summarize_text(WARMUP_TEXT)
+        warmup_seconds = time.perf_counter() - started
+        MODEL_WARMUP_SECONDS.labels(model=service.model_name).set(warmup_seconds)
+        logger.info(f"Summarization model {service.model_name} warmed up in {warmup_seconds:.2f}s")
+
+    def warmup_loaded(self) -> None:
+        """Warm up every resident model (e.g. in a child that inherited them from the parent)."""
+        with self._lock:
+            for service in list(self._services.values()):
+                self._warmup(service)
+
+    def preload_for_fork(self) -> None:
+        """
+        Load the models in the prefork parent so that children inherit them:
+        the weight tensors are never written after loading (eval mode, no
+        gradients), so their pages stay shared copy-on-write instead of every
+        child holding a private copy.
+        - No warm-up here: running inference would start the torch / OpenMP
+          thread pools in the parent, which are not safe to fork. Children
+          warm up themselves; that only allocates activations, not weights.
+        - gc.freeze() moves the loaded objects to the permanent generation so
+          the children's garbage collector does not touch (and copy) their pages.
+        """
+        self.load_all(warmup=False)
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            torch.set_grad_enabled(False)
+        gc.collect()
+        gc.freeze()
+
+    def get(self, model_name: Optional[str] = None) -> SummarizeService:
+        """
+        Return a loaded service, loading it lazily if the worker pool
+        did not trigger worker_process_init (e.g. solo/threads pools)
+        or the model was evicted.
+        """
+        with self._lock:
+            service = self._services.get(model_name or self.default_model)
+            if service is None:
+                return self.load(model_name)
+            self._services.move_to_end(service.model_name)
+            return service
+
+    def count_tokens(self, text: str) -> int:
+        if self._router_tokenizer is None:
+            self._router_tokenizer = AutoTokenizer.from_pretrained(self.tiers[0].model)
+        thresholds = [tier.max_tokens for tier in self.tiers if tier.max_tokens]
+        # No need to tokenize past the largest threshold
+        if thresholds:
+            text = text[:(max(thresholds) + 1) * MAX_CHARS_PER_TOKEN]
+        return len(self._router_tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def route(self, text: str) -> str:
+        """Pick the model tier for a text by its token count."""
+        if len(self.tiers) == 1:
+            return self.tiers[0].model
+        tokens = self.count_tokens(text or "")
+        for tier in self.tiers:
+            if tier.max_tokens is None or tokens <= tier.max_tokens:
+                return tier.model
+        return self.default_model
+
+
+model_registry = ModelRegistry()
+
+
+def get_summarize_service(model_name: Optional[str] = None) -> SummarizeService:
+    return model_registry.get(model_name)
@@ -0,0 +1,162 @@
+"""
+Note status counters (note_status_counts).
+
+Every flush that inserts a note, changes its status or deletes it bumps the
+(user_id, status) counters in the same transaction, so the counters commit or
+roll back together with the notes. The hook is on the ORM Session class and
+therefore covers the async API sessions and the sync worker sessions alike.
+Writes that bypass the unit of work (bulk INSERT, raw SQL) must add their
+own deltas with `status_deltas_upsert`; `reconcile_status_counts` fixes any drift.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, delete, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.note_model import Note
+from app.models.note_status_count_model import NoteStatusCount
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+NOTE_STATUSES = ("queued", "deferred", "pending", "processing", "completed", "failed")
+# reconcile_status_counts çalıştırmalarını birbirine karşı sıralar (yazarları etkilemez)
+RECONCILE_LOCK_KEY = 0x6E6F7465  # "note"
+
+
+def status_deltas_upsert(deltas: Dict[tuple, int]):
+    """
+    INSERT .. ON CONFLICT statement adding each (user_id, status) delta, or None.
+    Keys are sorted so concurrent transactions lock counter rows in the same order.
+    Also used directly by ORM-bypassing writes (bulk INSERT .. RETURNING).
+    """
+    rows = [
+        {"user_id": user_id, "status": status, "count": delta}
+        for (user_id, status), delta in sorted(deltas.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+        if delta
+    ]
+    if not rows:
+        return None
+    stmt = insert(NoteStatusCount).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[NoteStatusCount.user_id, NoteStatusCount.status],
+        set_={"count": NoteStatusCount.count + stmt.excluded.count},
+    )
+
+
+def apply_status_deltas(connection, deltas: Dict[tuple, int]) -> None:
+    stmt = status_deltas_upsert(deltas)
+    if stmt is not None:
+        connection.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_status_changes(session, flush_context):
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Note):
+            deltas[(obj.user_id, obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Note):
+            deltas[(obj.user_id, obj.status)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Note) and obj not in session.deleted:
+            history = inspect(obj).attrs.status.history
+            for old in history.deleted:
+                if old is not None:
+                    deltas[(obj.user_id, old)] -= 1
+            for new in history.added:
+                deltas[(obj.user_id, new)] += 1
+    if deltas:
+        apply_status_deltas(session.connection(), deltas)
+
+
+def exact_counts_query(user_id: Optional[UUID] = None):
+    """Tek GROUP BY ile status sayıları (kullanıcı bazlı: ix_notes_user_id_status_created_at_id)."""
+    query = select(Note.status, func.count()).group_by(Note.status)
+    if user_id is not None:
+        query = query.where(Note.user_id == user_id)
+    return query
+
+
+def counter_counts_query(user_id: Optional[UUID] = None):
+    """Aynı sonuç, note_status_counts sayaçlarından (notes tablosunun boyutundan bağımsız)."""
+    query = select(NoteStatusCount.status, func.sum(NoteStatusCount.count)).group_by(NoteStatusCount.status)
+    if user_id is not None:
+        query = query.where(NoteStatusCount.user_id == user_id)
+    return query
+
+
+def counts_by_status(rows: Iterable) -> Dict[str, int]:
+    counts = {status: 0 for status in NOTE_STATUSES}
+    for status, count in rows:
+        counts[status] = int(count or 0)
+    return counts
+
+
+def reconcile_status_counts(db: Session, batch_size: int = 500) -> int:
+    """
+    Recompute the counters from the notes table, batch_size users at a time,
+    and fix the rows that drifted. Returns the number of corrected rows.
+
+    Takes no table lock: the recount and the stored counters of a batch are
+    read in a single statement, i.e. from one snapshot, in which every writer
+    is either fully committed (notes and counter bump) or not at all. The
+    drift is then added with the same ON CONFLICT upsert writers use, so
+    writers committing later stack their deltas on top; only the drifted
+    counter rows are row-locked, briefly. Concurrent reconciles are
+    serialized with a transaction-level advisory lock so a drift is never
+    applied twice.
+    """
+    corrected = 0
+    last_id = None
+    while True:
+        query = select(User.id).order_by(User.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        user_ids = db.scalars(query).all()
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        db.execute(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_KEY)))
+        actual = (
+            select(Note.user_id, Note.status, func.count().label("count"))
+            .where(Note.user_id.in_(user_ids))
+            .group_by(Note.user_id, Note.status)
+            .subquery()
+        )
+        stored = (
+            select(NoteStatusCount.user_id, NoteStatusCount.status, NoteStatusCount.count)
+            .where(NoteStatusCount.user_id.in_(user_ids))
+            .subquery()
+        )
+        drift = select(
+            func.coalesce(actual.c.user_id, stored.c.user_id),
+            func.coalesce(actual.c.status, stored.c.status),
+            func.coalesce(actual.c.count, 0) - func.coalesce(stored.c.count, 0),
+        ).select_from(
+            actual.join(
+                stored,
+                and_(actual.c.user_id == stored.c.user_id, actual.c.status == stored.c.status),
+                full=True,
+            )
+        )
+        drifted = {(user_id, status): delta for user_id, status, delta in db.execute(drift) if delta}
+        if drifted:
+            logger.warning(f"note_status_counts drift in {len(drifted)} rows, correcting")
+            apply_status_deltas(db.connection(), drifted)
+            corrected += len(drifted)
+
+        # sıfıra inmiş sayaçları temizle; eşzamanlı bir yazar satırı güncellediyse
+        # koşul yeni değer üzerinden tekrar değerlendirilir ve satır silinmez
+        db.execute(delete(NoteStatusCount).where(
+            NoteStatusCount.user_id.in_(user_ids), NoteStatusCount.count == 0
+        ))
+        db.commit()
+
+    return corrected
@@ -0,0 +1,123 @@
+"""
+Transactional outbox for summarization.
+
+Writers insert a summarize_outbox row in the same transaction as the note
+(create, content update, bulk chunk, deferred release), so a committed
+queued note always has its enqueue recorded and requests never wait on the
+broker. The dispatcher (outbox_dispatcher.py) claims rows in batches with
+SELECT .. FOR UPDATE SKIP LOCKED, publishes them, deletes them and commits;
+several dispatchers can run side by side. Delivery is at least once: a crash
+between publish and commit publishes the batch again, which the idempotent
+tasks skip.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import delete, insert, select
+
+from app.config.settings import settings
+from app.models.summarize_outbox_model import SummarizeOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DISPATCHED = Counter(
+    "summarize_outbox_dispatched_total",
+    "Notes published from the outbox to the broker (rate = enqueued notes per second)",
+    ["queue"],
+)
+OUTBOX_DISPATCH_SECONDS = Histogram(
+    "summarize_outbox_dispatch_seconds",
+    "Time to claim, publish and delete one outbox batch",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+OUTBOX_LAG_SECONDS = Histogram(
+    "summarize_outbox_lag_seconds",
+    "Time between the outbox write (note commit) and the publish",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+
+def outbox_insert(note_ids: Iterable, queue: str):
+    """
+    INSERT of the outbox rows for `note_ids`; execute it in the transaction
+    that writes the notes. None when there is nothing to insert.
+    """
+    rows = [{"note_id": note_id, "queue": queue} for note_id in note_ids]
+    return insert(SummarizeOutbox).values(rows) if rows else None
+
+
+class OutboxDispatcher:
+    """
+    Drains summarize_outbox into the broker.
+    `publishers` maps an outbox queue to a callable publishing a list of note
+    IDs, injected so this module does not import Celery tasks. Each one should
+    publish the whole list in as few broker round trips as it can.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        publishers: Dict[str, Callable[[List[str]], None]],
+        batch_size: int = None,
+        poll_ms: int = None,
+    ):
+        self._session_factory = session_factory
+        self._publishers = publishers
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_ms = poll_ms or settings.OUTBOX_POLL_MS
+
+    def dispatch_batch(self) -> int:
+        """Publish and delete up to `batch_size` rows, oldest first. Returns the number published."""
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(SummarizeOutbox.id, SummarizeOutbox.note_id, SummarizeOutbox.queue, SummarizeOutbox.created_at)
+                .order_by(SummarizeOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                db.rollback()
+                return 0
+
+            by_queue: Dict[str, List[str]] = {}
+            for row in rows:
+                by_queue.setdefault(row.queue, []).append(str(row.note_id))
+            # yayın hatası: rollback, satırlar kilitten çıkar ve sonraki turda tekrar denenir
+            for queue, note_ids in by_queue.items():
+                self._publishers[queue](note_ids)
+
+            db.execute(delete(SummarizeOutbox).where(SummarizeOutbox.id.in_([row.id for row in rows])))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            OUTBOX_LAG_SECONDS.observe(max((now - row.created_at).total_seconds(), 0))
+        for queue, note_ids in by_queue.items():
+            OUTBOX_DISPATCHED.labels(queue=queue).inc(len(note_ids))
+        OUTBOX_DISPATCH_SECONDS.observe(time.perf_counter() - started)
+        return len(rows)
+
+    def run(self, stop: threading.Event) -> None:
+        """Dispatch until `stop` is set; full batches back to back, otherwise poll every `poll_ms`."""
+        logger.info(f"Outbox dispatcher started (batch size {self.batch_size}, poll {self.poll_ms} ms)")
+        while not stop.is_set():
+            try:
+                dispatched = self.dispatch_batch()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed, retrying: {e}")
+                stop.wait(max(self.poll_ms / 1000, 1))
+                continue
+            if dispatched < self.batch_size:
+                stop.wait(self.poll_ms / 1000)
+        logger.info("Outbox dispatcher stopped")
@@ -0,0 +1,100 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for the sort key of the last row of a page."""
+    plain = [value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, UUID) else value
+             for value in values]
+    return base64.urlsafe_b64encode(json.dumps(plain, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    Decode a cursor back into typed values for the given sort columns.
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    return [_typed_value(value, column) for value, column in zip(values, columns)]
+
+
+def _typed_value(value: Any, column) -> Any:
+    """
+    Check a decoded cursor value against its column's type, so a tampered
+    cursor is a ValueError (400) here instead of a database error (500).
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    # JSON'da bool da int'tir; sıralama kolonlarında hiçbir zaman geçerli değil
+    if isinstance(value, bool):
+        raise ValueError("Invalid cursor")
+    try:
+        if python_type in (datetime, UUID) and not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is UUID:
+            return UUID(value)
+        if python_type is float:
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError("Invalid cursor")
+            return float(value)
+        if python_type is int:
+            if not isinstance(value, int):
+                raise ValueError("Invalid cursor")
+            return value
+        if python_type is str:
+            if not isinstance(value, str):
+                raise ValueError("Invalid cursor")
+            return value
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    # tipi bilinmeyen kolon: yalnızca JSON skalerleri
+    if not isinstance(value, (str, int, float)):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def keyset_paginate(query, columns: Sequence, cursor: Optional[str], limit: int):
+    """
+    Keyset (seek) pagination, newest first.
+    - Stable order on `columns` (the last one must be unique, e.g. id).
+    - Continues strictly after the row encoded in `cursor`.
+    - Fetches one extra row to know whether a next page exists.
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+    if cursor:
+        query = query.where(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    return query.limit(limit + 1)
+
+
+def page_result(
+    rows: Sequence, columns: Sequence, limit: int, sort_key: Optional[Callable[[Any], Sequence]] = None
+) -> Tuple[list, Optional[str]]:
+    """
+    Split the `limit + 1` rows into the page items and the next cursor.
+    `sort_key(row)` returns the cursor values when they are not plain attributes
+    of the row named after the columns (e.g. computed rank columns).
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last = items[-1]
+    values = sort_key(last) if sort_key else [getattr(last, column.key) for column in columns]
+    return items, encode_cursor(values)
@@ -0,0 +1,131 @@
+"""
+Password hashing off the event loop and off Starlette's thread pool.
+
+bcrypt / argon2 run in a small dedicated process pool, so a login burst
+occupies at most PASSWORD_HASH_WORKERS cores and never the threads other
+requests need. At most PASSWORD_HASH_MAX_PENDING operations may be queued
+per API process; beyond that callers get PasswordHasherBusy (-> 503).
+If a pool process dies (OOM kill), the broken pool is replaced and the
+operation retried once; a second failure is reported as PasswordHasherBusy.
+"""
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from prometheus_client import Gauge, Histogram
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hash / verify operations submitted to the pool and not yet finished",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time from submitting a password operation to its result (queue wait included)",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+@lru_cache
+def password_context() -> CryptContext:
+    """
+    PASSWORD_SCHEME hashes new passwords; the other scheme is kept for
+    verification only (deprecated="auto"), so its hashes and hashes with an
+    outdated cost are upgraded on the next successful login.
+    argon2 needs the optional argon2-cffi package.
+    """
+    schemes = ["argon2", "bcrypt"] if settings.PASSWORD_SCHEME == "argon2" else ["bcrypt"]
+    if settings.PASSWORD_SCHEME != "argon2" and importlib.util.find_spec("argon2"):
+        schemes.append("argon2")
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        argon2__type="ID",
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST_KB,
+    )
+
+
+# ---- pool process'lerinde çalışır ----
+
+def _hash(password: str) -> str:
+    return password_context().hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return password_context().verify_and_update(password, hashed)
+
+
+# ---- API process ----
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: uvicorn/asyncpg thread ve bağlantılarını child'a kopyalamasın
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+async def _submit(operation: str, fn, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy(f"{_pending} password operations pending")
+
+    _pending += 1
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    started = time.perf_counter()
+    try:
+        # hash / verify idempotent: bozulan havuz yenisiyle değiştirilip bir kez tekrar denenir
+        for _ in range(2):
+            pool = _get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # bir child öldü (OOM vb.): havuz kalıcı olarak bozulmasın
+                logger.warning(f"Password hash pool broken during {operation}, recreating it")
+                if pool is _pool:
+                    shutdown_pool()
+        raise PasswordHasherBusy("Password hash pool keeps breaking")
+    finally:
+        _pending -= 1
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+        PASSWORD_HASH_SECONDS.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+async def hash_password(password: str) -> str:
+    return await _submit("hash", _hash, password)
+
+
+async def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash uses an outdated scheme or cost."""
+    return await _submit("verify", _verify_and_update, password, hashed)
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,199 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from uuid import UUID
+
+from prometheus_client import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config.redis_client import get_async_redis, get_redis
+from app.config.settings import settings
+from app.models.user_model import User
+from app.services.cache_service import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_REQUESTS = Counter(
+    "principal_cache_requests_total",
+    "Authenticated principal lookups by layer and result",
+    ["layer", "result"],
+)
+
+# bu alanlar değişince cache'teki principal geçersiz olur
+PRINCIPAL_FIELDS = ("role", "password")
+
+# Write a principal read from the DB only if the user's generation is still
+# the one seen before that read: an invalidation in between bumps it, so a
+# stale principal is never written back.
+SET_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller: what endpoints need from the user, without a live ORM object."""
+    id: UUID
+    role: str
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+
+class PrincipalCache:
+    """
+    User ID -> Principal, in-process TTL LRU in front of an optional Redis layer.
+    The local TTL bounds how long another process can serve a principal after
+    it was invalidated. Redis errors are treated as misses.
+    A miss is filled in two steps: `begin_fill` before the DB read, then
+    `set(principal, fill)`, which is skipped if the user was invalidated in
+    between (per-user generation in Redis, invalidation counter locally).
+    """
+
+    PREFIX = "principal:v1:"
+    GENERATION_PREFIX = "principal:gen:"
+
+    def __init__(
+        self,
+        async_redis_factory: Callable,
+        redis_factory: Callable,
+        maxsize: int = None,
+        ttl: int = None,
+        local_ttl: int = None,
+        enabled: bool = None,
+        use_redis: bool = None,
+    ):
+        self._async_redis_factory = async_redis_factory
+        self._redis_factory = redis_factory
+        self.ttl = ttl or settings.PRINCIPAL_CACHE_TTL_SECONDS
+        self.enabled = settings.PRINCIPAL_CACHE_ENABLED if enabled is None else enabled
+        self.use_redis = settings.PRINCIPAL_CACHE_REDIS if use_redis is None else use_redis
+        self.local = TTLLRUCache(
+            maxsize or settings.PRINCIPAL_CACHE_LOCAL_SIZE,
+            settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS if local_ttl is None else local_ttl,
+        )
+        # bu process'teki invalidation sayısı: değiştiyse eldeki DB okuması local'e yazılmaz
+        self._invalidations = 0
+        self._script = None
+
+    def key(self, user_id) -> str:
+        return f"{self.PREFIX}{user_id}"
+
+    def generation_key(self, user_id) -> str:
+        return f"{self.GENERATION_PREFIX}{user_id}"
+
+    async def get(self, user_id: UUID) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+
+        principal = self.local.get(user_id)
+        if principal is not None:
+            PRINCIPAL_CACHE_REQUESTS.labels(layer="local", result="hit").inc()
+            return principal
+        PRINCIPAL_CACHE_REQUESTS.labels(layer="local", result="miss").inc()
+
+        if not self.use_redis:
+            return None
+        try:
+            cached = await self._async_redis_factory().get(self.key(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache lookup failed: {e}")
+            cached = None
+
+        if cached is None:
+            PRINCIPAL_CACHE_REQUESTS.labels(layer="redis", result="miss").inc()
+            return None
+
+        PRINCIPAL_CACHE_REQUESTS.labels(layer="redis", result="hit").inc()
+        data = json.loads(cached)
+        principal = Principal(id=UUID(data["id"]), role=data["role"])
+        self.local.set(user_id, principal)
+        return principal
+
+    async def begin_fill(self, user_id: UUID) -> Tuple[int, Optional[str]]:
+        """Invalidation state to pass to `set` after reading the principal from the DB."""
+        generation = None
+        if self.enabled and self.use_redis:
+            try:
+                generation = await self._async_redis_factory().get(self.generation_key(user_id)) or "0"
+            except Exception as e:
+                logger.warning(f"Principal cache generation lookup failed: {e}")
+        return self._invalidations, generation
+
+    async def set(self, principal: Principal, fill: Tuple[int, Optional[str]]) -> None:
+        if not self.enabled:
+            return
+        invalidations, generation = fill
+        if invalidations != self._invalidations:
+            # okuma sırasında bu process'te bir kullanıcı invalidate edildi; hangisi olduğu önemsiz
+            PRINCIPAL_CACHE_REQUESTS.labels(layer="local", result="stale_fill").inc()
+            return
+        self.local.set(principal.id, principal)
+        # generation okunamadıysa Redis'e yazılmaz: arada invalidation olup olmadığı bilinemez
+        if not self.use_redis or generation is None:
+            return
+        if self._script is None:
+            self._script = self._async_redis_factory().register_script(SET_IF_CURRENT_SCRIPT)
+        try:
+            value = json.dumps({"id": str(principal.id), "role": principal.role})
+            written = await self._script(
+                keys=[self.key(principal.id), self.generation_key(principal.id)],
+                args=[generation, value, self.ttl],
+            )
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {e}")
+            return
+        if not written:
+            PRINCIPAL_CACHE_REQUESTS.labels(layer="redis", result="stale_fill").inc()
+            # local kopya da eskimiş olabilir
+            self.local.delete(principal.id)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Sync: called from ORM session events (API and scripts alike)."""
+        self._invalidations += 1
+        self.local.delete(user_id)
+        if not self.enabled or not self.use_redis:
+            return
+        try:
+            pipe = self._redis_factory().pipeline()
+            pipe.delete(self.key(user_id))
+            pipe.incr(self.generation_key(user_id))
+            # devam eden bir doldurma bu süreden çok daha kısa sürer
+            pipe.expire(self.generation_key(user_id), self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed for {user_id}: {e}")
+
+
+principal_cache = PrincipalCache(async_redis_factory=get_async_redis, redis_factory=get_redis)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session, flush_context):
+    """Role / password değişen veya silinen kullanıcıları commit sonrası invalidation için topla."""
+    changed = {
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and any(inspect(obj).attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS)
+    }
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault("principal_invalidations", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session):
+    # commit'ten sonra: commit öncesi silinse, eşzamanlı bir istek eski değeri tekrar yazabilirdi
+    for user_id in session.info.pop("principal_invalidations", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop("principal_invalidations", None)
@@ -0,0 +1,112 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.config.redis_client import get_async_redis
+from app.config.settings import RateLimit, settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limiter decisions by endpoint",
+    ["endpoint", "result"],
+)
+RATE_LIMIT_DECISION_SECONDS = Histogram(
+    "rate_limit_decision_seconds",
+    "Time spent deciding whether to admit a rate-limited request (one Redis round trip)",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05),
+)
+
+# Refill + take in one round trip, atomically. Clock is Redis' TIME so API
+# processes on different hosts share one notion of "now". Floats are returned
+# as strings: Lua numbers are truncated to integers in replies.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """
+    Redis token bucket per (endpoint, caller). Limits come from RATE_LIMITS,
+    overridden per user by RATE_LIMIT_USER_OVERRIDES; unlisted endpoints are
+    not limited and cost nothing. Redis errors fail open: the request passes.
+    """
+
+    PREFIX = "ratelimit:v1:"
+
+    def __init__(self, async_redis_factory: Callable, enabled: bool = None):
+        self._async_redis_factory = async_redis_factory
+        self.enabled = settings.RATE_LIMIT_ENABLED if enabled is None else enabled
+        self._script = None
+
+    def key(self, endpoint: str, caller: str) -> str:
+        return f"{self.PREFIX}{endpoint}:{caller}"
+
+    def limit_for(self, endpoint: str, user_id: Optional[str]) -> Optional[RateLimit]:
+        if user_id is not None:
+            override = settings.RATE_LIMIT_USER_OVERRIDES.get(user_id, {}).get(endpoint)
+            if override is not None:
+                return override
+        return settings.RATE_LIMITS.get(endpoint)
+
+    async def check(self, endpoint: str, caller: str, limit: RateLimit, cost: int = 1) -> Optional[RateLimitDecision]:
+        if self._script is None:
+            # evalsha; script'i ilk NOSCRIPT'te kendisi yükler
+            self._script = self._async_redis_factory().register_script(TOKEN_BUCKET_SCRIPT)
+
+        started = time.perf_counter()
+        try:
+            allowed, remaining, retry_after = await self._script(
+                keys=[self.key(endpoint, caller)], args=[limit.capacity, limit.refill_per_second, cost]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            RATE_LIMIT_DECISIONS.labels(endpoint=endpoint, result="error").inc()
+            return None
+        finally:
+            RATE_LIMIT_DECISION_SECONDS.observe(time.perf_counter() - started)
+
+        decision = RateLimitDecision(allowed=bool(allowed), remaining=float(remaining), retry_after=float(retry_after))
+        RATE_LIMIT_DECISIONS.labels(endpoint=endpoint, result="allowed" if decision.allowed else "limited").inc()
+        return decision
+
+
+rate_limiter = RateLimiter(async_redis_factory=get_async_redis)
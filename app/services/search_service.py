@@ -0,0 +1,61 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, func
+
+from app.models.note_model import Note, SEARCH_CONFIG
+
+# fts: generated search_vector + GIN index; trgm: pg_trgm substring / typo fallback
+SEARCH_MODES = ("fts", "trgm")
+# pg_trgm index'i 3 karakterden kısa aramalarda kullanılamaz
+MIN_TRIGRAM_QUERY_LENGTH = 3
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter= … "
+
+
+def fulltext_search(query, q: str) -> Tuple:
+    """
+    Full-text match ranked by ts_rank, with a highlighted snippet of the content.
+    Returns the query and its keyset sort columns (rank, created_at, id).
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(Note.search_vector, tsquery, type_=Float).label("rank")
+    snippet = func.ts_headline(SEARCH_CONFIG, Note.content, tsquery, HEADLINE_OPTIONS).label("snippet")
+    query = query.add_columns(rank, snippet).where(Note.search_vector.op("@@")(tsquery))
+    return query, (rank, Note.created_at, Note.id)
+
+
+def trigram_search(query, q: str) -> Tuple:
+    """
+    Substring (ILIKE) and typo (word similarity) matches on title and content,
+    both served by the gin_trgm_ops indexes. Ranked by the best word similarity.
+    """
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    rank = func.greatest(
+        func.word_similarity(q, Note.title), func.word_similarity(q, Note.content), type_=Float
+    ).label("rank")
+    snippet = func.left(Note.content, 200).label("snippet")
+    query = query.add_columns(rank, snippet).where(
+        Note.title.ilike(pattern, escape="\\")
+        | Note.content.ilike(pattern, escape="\\")
+        # col %> q  <=>  word_similarity(q, col) >= pg_trgm.word_similarity_threshold
+        | Note.title.op("%>")(q)
+        | Note.content.op("%>")(q)
+    )
+    return query, (rank, Note.created_at, Note.id)
+
+
+SEARCHES = {"fts": fulltext_search, "trgm": trigram_search}
+
+
+def encode_search_cursor(mode: str, cursor: Optional[str]) -> Optional[str]:
+    """Sonraki sayfa aynı arama modunda devam etsin diye mod cursor'a eklenir."""
+    return f"{mode}.{cursor}" if cursor else None
+
+
+def decode_search_cursor(cursor: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Raises ValueError for malformed cursors."""
+    if not cursor:
+        return "fts", None
+    mode, _, inner = cursor.partition(".")
+    if mode not in SEARCH_MODES or not inner:
+        raise ValueError("Invalid cursor")
+    return mode, inner
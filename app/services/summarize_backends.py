@@ -0,0 +1,92 @@
+import logging
+import os
+from typing import Dict, Type
+
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TorchBackend:
+    """
+    fp32 PyTorch on CPU (the original pipeline behaviour).
+    Every backend exposes `tokenizer`, `model` and `generate()`.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = self._load_model(model_name)
+
+    def _load_model(self, model_name: str):
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model.eval()
+        # inference only: weights are never written, so forked children keep sharing their pages
+        model.requires_grad_(False)
+        return model
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        import torch
+
+        with torch.inference_mode():
+            return self.model.generate(input_ids=input_ids, attention_mask=attention_mask, **kwargs)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """
+    Dynamic int8 quantization of the Linear layers (weights int8,
+    activations quantized on the fly). No calibration data needed.
+    """
+
+    name = "torch-int8"
+
+    def _load_model(self, model_name: str):
+        import torch
+
+        model = super()._load_model(model_name)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(TorchBackend):
+    """
+    Encoder-decoder exported to ONNX and run with ONNX Runtime (via optimum).
+    The export is done once and reused from SUMMARIZE_ONNX_DIR.
+    """
+
+    name = "onnx"
+
+    def _load_model(self, model_name: str):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("The onnx backend requires `optimum[onnxruntime]` to be installed") from e
+
+        export_dir = os.path.join(
+            settings.SUMMARIZE_ONNX_DIR or os.path.expanduser("~/.cache/mini-crm/onnx"),
+            model_name.replace("/", "--"),
+        )
+        if os.path.isdir(export_dir):
+            return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+
+        logger.info(f"Exporting {model_name} to ONNX at {export_dir}")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        return model
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        return self.model.generate(input_ids=input_ids, attention_mask=attention_mask, **kwargs)
+
+
+BACKENDS: Dict[str, Type[TorchBackend]] = {
+    backend.name: backend for backend in (TorchBackend, QuantizedTorchBackend, OnnxBackend)
+}
+
+
+def load_backend(name: str, model_name: str) -> TorchBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summarization backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model_name)
@@ -0,0 +1,92 @@
+import logging
+from typing import Callable, Iterable, List
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = "summarize:batch:buffer"
+TIMER_KEY = "summarize:batch:timer"
+# flush task id -> o task'ın buffer'dan aldığı note ID'leri (iş bitene kadar)
+PROCESSING_PREFIX = "summarize:batch:processing:"
+# sahipsiz kalan (task'ı hiç yeniden teslim edilmeyen) processing list'leri sonsuza kadar durmasın
+PROCESSING_TTL_SECONDS = 24 * 3600
+
+
+class SummarizeBatcher:
+    """
+    Collects note IDs in a Redis list and flushes them in batches.
+    - A flush is dispatched as soon as `batch_size` IDs are buffered.
+    - Otherwise the first ID of a window schedules a flush `window_ms` later.
+    The flush itself is injected so this module does not import Celery tasks.
+    `flush(countdown, batches)` must dispatch `batches` flushes with a single
+    broker message, so a large push costs one publish instead of one per batch.
+    """
+
+    def __init__(
+        self,
+        redis_factory: Callable,
+        flush: Callable[[float, int], None],
+        batch_size: int = None,
+        window_ms: int = None,
+    ):
+        self._redis_factory = redis_factory
+        self._flush = flush
+        self.batch_size = batch_size or settings.SUMMARIZE_BATCH_SIZE
+        self.window_ms = window_ms or settings.SUMMARIZE_BATCH_WINDOW_MS
+
+    @property
+    def redis(self):
+        return self._redis_factory()
+
+    def add(self, note_ids: Iterable) -> None:
+        """Buffer note IDs and dispatch flushes for every full batch."""
+        note_ids = [str(note_id) for note_id in note_ids]
+        if not note_ids:
+            return
+
+        pipe = self.redis.pipeline()
+        pipe.rpush(BUFFER_KEY, *note_ids)
+        pipe.set(TIMER_KEY, 1, nx=True, px=self.window_ms)
+        length, timer_started = pipe.execute()
+
+        # Number of batch boundaries crossed by this push
+        full_batches = length // self.batch_size - (length - len(note_ids)) // self.batch_size
+        if full_batches:
+            if timer_started:
+                # leftovers are picked up by reschedule_if_pending after these flushes
+                self.redis.delete(TIMER_KEY)
+            self._flush(0, full_batches)
+        elif timer_started:
+            self._flush(self.window_ms / 1000, 1)
+
+    def claim_batch(self, claim_id: str) -> List[str]:
+        """
+        Move up to `batch_size` IDs from the buffer into a processing list owned
+        by `claim_id` (the flush task id) with LMOVE, in one MULTI/EXEC.
+        If the worker dies mid-batch (OOM, hard time limit), the redelivered
+        flush has the same task id and gets the same IDs back instead of an
+        empty batch. Call `release(claim_id)` once the batch is handled.
+        """
+        key = PROCESSING_PREFIX + claim_id
+        claimed = self.redis.lrange(key, 0, -1)
+        if claimed:
+            logger.warning(f"Resuming {len(claimed)} note IDs claimed by flush {claim_id}")
+            return claimed
+
+        pipe = self.redis.pipeline()
+        for _ in range(self.batch_size):
+            pipe.lmove(BUFFER_KEY, key, "LEFT", "RIGHT")
+        pipe.expire(key, PROCESSING_TTL_SECONDS)
+        return [note_id for note_id in pipe.execute()[:-1] if note_id is not None]
+
+    def release(self, claim_id: str) -> None:
+        self.redis.delete(PROCESSING_PREFIX + claim_id)
+
+    def reschedule_if_pending(self) -> None:
+        """Make sure leftovers in the buffer get a flush of their own."""
+        if self.redis.llen(BUFFER_KEY) and self.redis.set(TIMER_KEY, 1, nx=True, px=self.window_ms):
+            self._flush(self.window_ms / 1000, 1)
+
+    def pending(self) -> int:
+        return self.redis.llen(BUFFER_KEY)
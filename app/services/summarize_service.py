@@ -1,60 +1,228 @@
-from transformers import pipeline
+import hashlib
+import json
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.chunk_service import chunk_by_tokens
+from app.services.summarize_backends import load_backend
+from app.services.metrics_service import StageTimer
 
 logger = logging.getLogger(__name__)
 
+# rule-based fallback'in ürettiği (veya kısa olduğu için aynen dönen) metinlerin model etiketi
+RULE_BASED_MODEL = "rule-based"
+
+
+def generation_params(backend_name: Optional[str] = None) -> dict:
+    """
+    Parameters that change the generated summary (part of the summary cache key).
+    Computed from settings so callers do not need a loaded model.
+    """
+    return {
+        **SummarizeService.GENERATION_KWARGS,
+        "backend": backend_name or settings.SUMMARIZE_BACKEND,
+        "max_input_tokens": settings.SUMMARIZE_MAX_INPUT_TOKENS,
+        "max_chunks": settings.SUMMARIZE_MAX_CHUNKS,
+    }
+
+
+def summary_version(model_name: str, params: Optional[dict] = None) -> str:
+    """
+    Short fingerprint of a model and its generation parameters, stored on the
+    note next to the summary. Changing either gives a new version.
+    """
+    signature = json.dumps({"model": model_name, "params": params or generation_params()}, sort_keys=True)
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()[:16]
+
+
 class SummarizeService:
-    def __init__(self):
+    GENERATION_KWARGS = {"max_length": 150, "min_length": 30, "do_sample": False}
+    # reduce turu üst sınırı; SUMMARIZE_MAX_CHUNKS özet 3x pencerede iki turda teke iner
+    MAX_REDUCE_ROUNDS = 4
+    # giriş penceresi en az bu kadar özet sığdırmalı, yoksa reduce turları özet sayısını azaltmaz
+    MIN_WINDOW_SUMMARIES = 3
+
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[str] = None):
+        self.model_name = model_name or settings.SUMMARIZE_MODEL_NAME
+        self.backend_name = backend or settings.SUMMARIZE_BACKEND
+        self.max_input_tokens = settings.SUMMARIZE_MAX_INPUT_TOKENS
         try:
-            # Use a lightweight model for summarization
-            self.summarizer = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn",
-                device=-1  # Use CPU
+            # CPU inference: torch | torch-int8 | onnx
+            self.backend = load_backend(self.backend_name, self.model_name)
+            # BART max 1024 tokens
+            self.max_input_tokens = min(
+                settings.SUMMARIZE_MAX_INPUT_TOKENS,
+                self.backend.tokenizer.model_max_length
             )
-            logger.info("AI summarization model loaded successfully")
+            logger.info(f"AI summarization model {self.model_name} ({self.backend_name}) loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load summarization model: {e}")
-            self.summarizer = None
+            self.backend = None
+        self.check_input_window(self.max_input_tokens)
+
+    @classmethod
+    def check_input_window(cls, max_input_tokens: int) -> None:
+        """
+        The map-reduce only converges when one input window holds several
+        generated summaries; a window near `max_length` re-chunks the
+        concatenated summaries into as many windows as before.
+        """
+        required = cls.MIN_WINDOW_SUMMARIES * cls.GENERATION_KWARGS["max_length"]
+        if max_input_tokens < required:
+            raise ValueError(
+                f"Summarization input window of {max_input_tokens} tokens is too small: "
+                f"at least {required} tokens ({cls.MIN_WINDOW_SUMMARIES} x max_length) are needed, "
+                f"raise SUMMARIZE_MAX_INPUT_TOKENS or use a model with a longer context"
+            )
+
+    @property
+    def cache_params(self) -> dict:
+        return generation_params(self.backend_name)
 
-    def summarize_text(self, text: str) -> Optional[str]:
+    def summarize_text(self, text: str, timer: Optional[StageTimer] = None) -> Tuple[Optional[str], str]:
         """
-        Summarize the given text using Hugging Face model or fallback
+        Summarize the given text using Hugging Face model or fallback.
+        Returns (summary, used_model): the model name for model output,
+        RULE_BASED_MODEL when the fallback produced it (model not loaded or
+        inference failed), so callers never cache or label it as model output.
         """
         if not text or len(text.strip()) < 10:
-            return text
+            return text, RULE_BASED_MODEL
 
         text = text.strip()
 
         # Try AI summarization first
-        if self.summarizer:
+        if self.backend:
             try:
-                return self._ai_summarize(text)
+                return self._ai_summarize(text, timer), self.model_name
             except Exception as e:
                 logger.error(f"AI summarization failed: {e}")
 
         # Fallback to rule-based summarization
-        return self._rule_based_summary(text)
+        return self._rule_based_summary(text), RULE_BASED_MODEL
 
-    def _ai_summarize(self, text: str) -> str:
+    def summarize_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        timer: Optional[StageTimer] = None
+    ) -> List[Tuple[Optional[str], str]]:
         """
-        AI-based summarization using Hugging Face
+        Summarize many texts with padded, multi-note forward passes.
+        Inputs are sorted by length so padding waste stays small; results are
+        returned in the original order as (summary, used_model) pairs, see
+        `summarize_text`. If the batched call fails, each text is summarized
+        on its own so one bad note cannot fail the others.
         """
-        # Limit input length for the model (BART max ~1024 tokens)
-        max_input_length = 1024
-        if len(text) > max_input_length:
-            text = text[:max_input_length]
-
-        # Generate summary
-        summary = self.summarizer(
-            text,
-            max_length=150,
-            min_length=30,
-            do_sample=False
-        )
-
-        return summary[0]['summary_text']
+        results: List[Tuple[Optional[str], str]] = [(None, RULE_BASED_MODEL)] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if not text or len(text.strip()) < 10:
+                results[index] = (text, RULE_BASED_MODEL)
+            else:
+                pending.append((index, text.strip()))
+
+        if not pending:
+            return results
+
+        if self.backend:
+            try:
+                # Notes that fit into one window are batched together,
+                # longer ones go through map-reduce on their own.
+                single, multi = [], []
+                for index, text in pending:
+                    chunks = self._chunk(text, timer)
+                    if len(chunks) == 1:
+                        single.append((index, chunks[0]))
+                    else:
+                        multi.append((index, chunks))
+
+                single.sort(key=lambda item: len(item[1]))
+                batch_size = batch_size or len(single) or 1
+                for start in range(0, len(single), batch_size):
+                    batch = single[start:start + batch_size]
+                    summaries = self._generate([text for _, text in batch], timer)
+                    for (index, _), summary in zip(batch, summaries):
+                        results[index] = (summary, self.model_name)
+
+                for index, chunks in multi:
+                    results[index] = (self._map_reduce(chunks, timer), self.model_name)
+                return results
+            except Exception as e:
+                logger.error(f"Batched AI summarization failed, falling back to per-note: {e}")
+
+        # Per-note isolation
+        for index, text in pending:
+            try:
+                results[index] = self.summarize_text(text, timer)
+            except Exception as e:
+                logger.error(f"Summarization failed for batch item {index}: {e}")
+        return results
+
+    def _ai_summarize(self, text: str, timer: Optional[StageTimer] = None) -> str:
+        """
+        AI-based summarization using Hugging Face.
+        Long texts are chunked into token windows and summarized map-reduce style.
+        """
+        return self._map_reduce(self._chunk(text, timer), timer)
+
+    def _chunk(self, text: str, timer: Optional[StageTimer] = None) -> List[str]:
+        timer = timer or StageTimer()
+        with timer.stage("tokenize"):
+            return chunk_by_tokens(
+                text,
+                self.backend.tokenizer,
+                max_tokens=self.max_input_tokens,
+                max_chunks=settings.SUMMARIZE_MAX_CHUNKS
+            )
+
+    def _map_reduce(self, chunks: List[str], timer: Optional[StageTimer] = None) -> str:
+        """
+        Map: summarize all chunks in one batch.
+        Reduce: summarize the concatenated chunk summaries, re-chunking
+        until everything fits into a single window, for at most
+        MAX_REDUCE_ROUNDS rounds; what is left then is joined as is.
+        """
+        if not chunks:
+            raise ValueError("Nothing to summarize")
+        summaries = self._generate(chunks, timer)
+        rounds = 0
+        while len(summaries) > 1 and rounds < self.MAX_REDUCE_ROUNDS:
+            rounds += 1
+            chunks = self._chunk(" ".join(summaries), timer)
+            if not chunks:
+                break
+            summaries = self._generate(chunks, timer)
+        if len(summaries) > 1:
+            logger.warning(f"Map-reduce stopped after {rounds} rounds with {len(summaries)} summaries, joining them")
+        return " ".join(summaries)
+
+    def _generate(self, texts: List[str], timer: Optional[StageTimer] = None) -> List[str]:
+        """
+        Tokenize -> generate -> decode, timing tokenization and generation separately.
+        """
+        timer = timer or StageTimer()
+        tokenizer = self.backend.tokenizer
+
+        with timer.stage("tokenize"):
+            inputs = tokenizer(
+                texts,
+                padding=True,
+                truncation=True,
+                max_length=self.max_input_tokens,
+                return_tensors="pt"
+            )
+
+        with timer.stage("generate"):
+            output_ids = self.backend.generate(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                **self.GENERATION_KWARGS
+            )
+
+        with timer.stage("tokenize"):
+            return tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
 
     def _rule_based_summary(self, text: str) -> str:
         """
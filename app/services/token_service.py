@@ -1,18 +1,121 @@
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from jwt.algorithms import get_default_algorithms
+from prometheus_client import Counter
+
 from app.config.settings import settings
-from typing import Optional
+from app.services.cache_service import TTLLRUCache
+
+JWT_VERIFY_CACHE_REQUESTS = Counter(
+    "jwt_verify_cache_requests_total",
+    "Access token verifications served from the verified-token cache",
+    ["result"],
+)
+
+# Doğrulanmış token digest'i -> claims; kayıt token'ın exp'i kadar yaşar
+_verified = TTLLRUCache(settings.JWT_VERIFY_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return not algorithm.startswith("HS")
+
+
+@lru_cache
+def _load_keys(
+    algorithm: str, private_key_file: Optional[str], key_id: Optional[str], public_key_files: Tuple[Tuple[str, str], ...]
+):
+    """
+    (signing key, kid, {kid: verification key}).
+    HS*: the shared secret for both. RS*/ES*/EdDSA: the PEM private key signs,
+    its public key plus JWT_PUBLIC_KEY_FILES (e.g. keys being rotated out) verify.
+    """
+    if not is_asymmetric(algorithm):
+        if not settings.JWT_SECRET_KEY:
+            raise RuntimeError(f"JWT_SECRET_KEY is required for {algorithm}")
+        return settings.JWT_SECRET_KEY, None, {None: settings.JWT_SECRET_KEY}
+
+    if not private_key_file or not key_id:
+        raise RuntimeError(f"JWT_PRIVATE_KEY_FILE and JWT_KEY_ID are required for {algorithm}")
+    with open(private_key_file, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+
+    public_keys = {key_id: private_key.public_key()}
+    for kid, path in public_key_files:
+        with open(path, "rb") as f:
+            public_keys[kid] = serialization.load_pem_public_key(f.read())
+    return private_key, key_id, public_keys
+
+
+def signing_keys():
+    return _load_keys(
+        settings.JWT_ALGORITHM,
+        settings.JWT_PRIVATE_KEY_FILE,
+        settings.JWT_KEY_ID,
+        tuple(sorted(settings.JWT_PUBLIC_KEY_FILES.items())),
+    )
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    key, kid, _ = signing_keys()
+    headers = {"kid": kid} if kid else None
+    return jwt.encode(to_encode, key, algorithm=settings.JWT_ALGORITHM, headers=headers)
 
-def verify_access_token(token: str) -> Optional[dict]:
+
+def _decode(token: str) -> Optional[dict]:
+    _, _, public_keys = signing_keys()
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
+        kid = jwt.get_unverified_header(token).get("kid") if is_asymmetric(settings.JWT_ALGORITHM) else None
+        key = public_keys.get(kid)
+        if key is None:
+            return None
+        return jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
+    except jwt.PyJWTError:
         return None
+
+
+def verify_access_token(token: str) -> Optional[dict]:
+    """
+    Claims of a valid token, or None.
+    Verified tokens are cached by digest until their `exp`, so a token reused
+    across requests is signature-checked once. Failures are never cached.
+    The returned dict is shared with the cache: treat it as read-only.
+    """
+    if not settings.JWT_VERIFY_CACHE_ENABLED:
+        return _decode(token)
+
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _verified.get(digest)
+    if payload is not None:
+        JWT_VERIFY_CACHE_REQUESTS.labels(result="hit").inc()
+        return payload
+    JWT_VERIFY_CACHE_REQUESTS.labels(result="miss").inc()
+
+    payload = _decode(token)
+    if payload is not None and "exp" in payload:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            _verified.set(digest, payload, ttl=ttl)
+    return payload
+
+
+def jwks() -> Dict[str, list]:
+    """Public verification keys as a JWK Set (empty for HS*: the secret is never published)."""
+    if not is_asymmetric(settings.JWT_ALGORITHM):
+        return {"keys": []}
+    _, _, public_keys = signing_keys()
+    algorithm = get_default_algorithms()[settings.JWT_ALGORITHM]
+    keys = []
+    for kid, key in public_keys.items():
+        jwk = algorithm.to_jwk(key, as_dict=True)
+        jwk.update({"kid": kid, "alg": settings.JWT_ALGORITHM, "use": "sig"})
+        keys.append(jwk)
+    return {"keys": keys}
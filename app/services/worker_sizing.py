@@ -0,0 +1,223 @@
+"""
+Worker sizing for CPU inference.
+
+Every prefork child runs PyTorch with its own intra-op thread pool and,
+unless the parent preloads the models (WORKER_PRELOAD_IN_PARENT), holds its
+own model copy. Left alone, each child starts one thread per core and
+N children oversubscribe the CPU N times. The plan here partitions the cores
+instead: max children is bounded by the CPUs and by the memory the container
+may use (cgroup limits, not the host's), and every child gets
+cpus // max_children threads.
+"""
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from celery.worker.autoscale import Autoscaler
+
+from app.config.celery_config import queue_keys
+from app.config.redis_client import get_redis
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> float:
+    """CPUs this process may use: affinity mask, capped by the cgroup CPU quota (v2 or v1)."""
+    cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)
+
+    quota = None
+    cpu_max = _read(f"{CGROUP_ROOT}/cpu.max")  # v2: "<quota> <period>" | "max <period>"
+    if cpu_max:
+        limit, _, period = cpu_max.partition(" ")
+        if limit != "max":
+            quota = int(limit) / int(period)
+    else:
+        limit, period = _read(f"{CGROUP_ROOT}/cpu/cpu.cfs_quota_us"), _read(f"{CGROUP_ROOT}/cpu/cpu.cfs_period_us")
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+
+    return min(cpus, quota) if quota else cpus
+
+
+def available_memory_mb() -> float:
+    """Memory this process may use: MemTotal, capped by the cgroup memory limit (v2 or v1)."""
+    total = None
+    meminfo = _read("/proc/meminfo") or ""
+    for line in meminfo.splitlines():
+        if line.startswith("MemTotal:"):
+            total = int(line.split()[1]) / 1024
+            break
+
+    limit = _read(f"{CGROUP_ROOT}/memory.max") or _read(f"{CGROUP_ROOT}/memory/memory.limit_in_bytes")
+    if limit and limit != "max":
+        limit_mb = int(limit) / 1024 / 1024
+        # v1 "sınırsız" değeri page-aligned maxint
+        if total is None or limit_mb < total:
+            total = limit_mb
+    return total or 0.0
+
+
+def preloads_in_parent() -> bool:
+    """Models are loaded once in the prefork parent and shared copy-on-write by the children."""
+    return (
+        settings.WORKER_PRELOAD_MODELS
+        and settings.WORKER_PRELOAD_IN_PARENT
+        and settings.SUMMARIZE_BACKEND != "onnx"
+    )
+
+
+def models_memory_mb() -> float:
+    """Estimated memory of the preloaded models."""
+    if not settings.WORKER_PRELOAD_MODELS:
+        return 0.0
+    tiers = settings.SUMMARIZE_MODEL_TIERS
+    if settings.SUMMARIZE_MODEL_MEMORY_BUDGET_MB:
+        return settings.SUMMARIZE_MODEL_MEMORY_BUDGET_MB
+    if tiers and all(tier.memory_mb for tier in tiers):
+        return sum(tier.memory_mb for tier in tiers)
+    return settings.WORKER_MODEL_MEMORY_MB
+
+
+def child_memory_mb() -> float:
+    """Estimated unique memory of one child with its models loaded."""
+    if preloads_in_parent():
+        # ağırlıklar parent'ta bir kez; child'a sadece kendi runtime'ı ve aktivasyonları kalır
+        return settings.WORKER_CHILD_OVERHEAD_MB
+    return models_memory_mb() + settings.WORKER_CHILD_OVERHEAD_MB
+
+
+@dataclass(frozen=True)
+class WorkerPlan:
+    cpus: float
+    memory_mb: float
+    shared_memory_mb: float
+    child_memory_mb: float
+    min_concurrency: int
+    max_concurrency: int
+    threads_per_child: int
+
+    def describe(self) -> str:
+        return (
+            f"cpus={self.cpus:g} memory={self.memory_mb:.0f}MB shared~{self.shared_memory_mb:.0f}MB "
+            f"child~{self.child_memory_mb:.0f}MB -> "
+            f"children {self.min_concurrency}..{self.max_concurrency} x {self.threads_per_child} threads"
+        )
+
+
+def plan_worker(cpus: float = None, memory_mb: float = None) -> WorkerPlan:
+    cpus = cpus or available_cpus()
+    memory_mb = memory_mb or available_memory_mb()
+    cores = max(1, math.floor(cpus))
+    shared = models_memory_mb() if preloads_in_parent() else 0.0
+    per_child = child_memory_mb()
+
+    usable = memory_mb - settings.WORKER_MEMORY_RESERVE_MB - shared
+    by_memory = max(1, int(usable // per_child)) if memory_mb else cores
+    by_cpu = max(1, cores // settings.WORKER_THREADS_PER_CHILD) if settings.WORKER_THREADS_PER_CHILD else cores
+    max_children = min(by_cpu, by_memory, settings.WORKER_MAX_CONCURRENCY or by_cpu)
+    # bellek child sayısını kısıtladıysa boşta kalan çekirdekler thread olarak dağıtılır
+    threads = threads_per_child(max_children, cpus)
+
+    return WorkerPlan(
+        cpus=cpus,
+        memory_mb=memory_mb,
+        shared_memory_mb=shared,
+        child_memory_mb=per_child,
+        min_concurrency=max(1, min(settings.WORKER_MIN_CONCURRENCY, max_children)),
+        max_concurrency=max_children,
+        threads_per_child=threads,
+    )
+
+
+def threads_per_child(concurrency: int, cpus: float = None) -> int:
+    """Torch threads of each child when the pool runs `concurrency` children at most."""
+    if settings.WORKER_THREADS_PER_CHILD:
+        return settings.WORKER_THREADS_PER_CHILD
+    cores = max(1, math.floor(cpus or available_cpus()))
+    return max(1, cores // max(1, concurrency))
+
+
+def pool_max_concurrency(worker) -> int:
+    """
+    Largest pool size of a Celery WorkController, readable at worker_init:
+    the --autoscale maximum if given, otherwise the fixed --concurrency
+    (Celery's default: the host's CPU count).
+    """
+    autoscale = worker.options.get("autoscale")
+    if isinstance(autoscale, str):
+        autoscale = autoscale.partition(",")[0]
+    elif autoscale:
+        autoscale = autoscale[0]
+    return int(autoscale) if autoscale else worker.concurrency
+
+
+def autosize_worker_args(argv: List[str], plan: WorkerPlan) -> List[str]:
+    """
+    Add --autoscale=max,min for a `worker` command line unless the caller
+    already fixed the pool size (--concurrency / -c / --autoscale).
+    """
+    fixed = any(
+        arg in ("-c", "--concurrency", "--autoscale") or arg.startswith(("--concurrency=", "--autoscale=", "-c"))
+        for arg in argv
+    )
+    if fixed:
+        return argv
+    return argv + [f"--autoscale={plan.max_concurrency},{plan.min_concurrency}"]
+
+
+def limit_threads(threads: int) -> None:
+    """
+    Pin the BLAS / PyTorch thread pools of the current process. The env vars
+    cover libraries that read them at import; torch is adjusted directly
+    since it may already be imported by the parent.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # inter-op pool zaten başlamışsa değiştirilemez
+        pass
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """
+    Celery's autoscaler only counts the messages a worker already reserved;
+    with worker_prefetch_multiplier=1 that is never more than the running
+    children, so it would not scale up. This one also counts the messages
+    waiting in Redis for the queues the worker consumes.
+    Enabled with --autoscale=max,min (worker_autoscaler in celery_config).
+    """
+
+    @property
+    def qty(self) -> int:
+        return super().qty + self.waiting()
+
+    def waiting(self) -> int:
+        keys = [key for queue in self.worker.app.amqp.queues.consume_from for key in queue_keys(queue)]
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for key in keys:
+                pipe.llen(key)
+            return sum(pipe.execute())
+        except Exception as e:
+            logger.warning(f"Autoscaler could not read queue depth: {e}")
+            return 0
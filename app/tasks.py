@@ -1,34 +1,119 @@
-from celery import Celery
+from celery import group
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
 from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from app.config.celery_config import BULK_QUEUE, INTERACTIVE_QUEUE, celery_app
+from app.config.db import SessionLocal
+from app.config.redis_client import get_redis
+from app.config.request_context import current_endpoint
 from app.config.settings import settings
 from app.models.note_model import Note
-from app.services.summarize_service import SummarizeService
+from app.services.admission_service import admission_controller, release_deferred
+from app.services.backfill_service import BACKFILL_NOTES, BACKFILL_STATUSES
+from app.services.cache_service import SummaryCache, content_hash
+from app.services.metrics_service import StageTimer, mark_process_dead, record_process_memory, start_metrics_server
+from app.services.model_registry import get_summarize_service, model_registry
+from app.services.note_stats_service import reconcile_status_counts
+from app.services.outbox_service import OutboxDispatcher
+from app.services.summarize_batcher import SummarizeBatcher
+from app.services.summarize_service import RULE_BASED_MODEL, generation_params, summary_version
+from app.services.worker_sizing import limit_threads, plan_worker, pool_max_concurrency, preloads_in_parent, threads_per_child
 import logging
+import os
 import time
 
 logger = logging.getLogger(__name__)
 
-# Initialize Celery
-celery_app = Celery(
-    'mini-crm',
-    broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL
-)
+# CELERY_TASK_ROUTES'ta flush_summarize_batch yoksa bulk batch'ten tek tek yeniden kuyruğa alınan notların önceliği
+BULK_REQUEUE_PRIORITY = 5
+
+@worker_init.connect
+def start_worker_metrics(**kwargs):
+    """Worker (parent) açılırken metrics endpoint'ini başlat."""
+    if settings.WORKER_METRICS_PORT:
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+
+
+_child_threads = None
+
+
+@worker_init.connect
+def size_child_threads(sender, **kwargs):
+    """
+    Child başına torch thread sayısı, havuzun gerçek üst sınırından: --autoscale max'ı
+    ya da -c/--concurrency. `celery -A celery_worker` ve `python celery_worker.py` aynı yoldan geçer.
+    Child'lar değeri fork ile devralır; parent'ın kendi havuzu da (model preload) aynı sınırla açılır.
+    """
+    global _child_threads
+    concurrency = pool_max_concurrency(sender)
+    _child_threads = threads_per_child(concurrency)
+    limit_threads(_child_threads)
+    logger.info(f"Worker pool up to {concurrency} children x {_child_threads} threads")
+
+
+@worker_init.connect
+def preload_summarization_model(**kwargs):
+    """
+    Modelleri child'lar fork edilmeden önce parent'ta yükle: ağırlık sayfaları
+    copy-on-write ile tüm child'lar arasında paylaşılır, her child kendi kopyasını tutmaz.
+    """
+    if preloads_in_parent():
+        model_registry.preload_for_fork()
+        memory = record_process_memory()
+        if memory:
+            logger.info(f"Models preloaded in worker parent: {memory['rss'] / 1024 / 1024:.0f} MB RSS")
+
+
+@worker_process_init.connect
+def load_summarization_model(**kwargs):
+    """
+    Her worker child process'i açılırken modelleri (bellek bütçesi kadar) bir kez yükle.
+    Böylece task'lar sadece inference maliyetini öder.
+    Thread sayısı model yüklenmeden sabitlenir: child'lar çekirdekleri paylaşır, birbirini ezmez.
+    Parent modelleri önceden yüklediyse child onları devralır, sadece warm-up yapar.
+    """
+    limit_threads(_child_threads or plan_worker().threads_per_child)
+    if model_registry.is_loaded():
+        if settings.SUMMARIZE_WARMUP:
+            model_registry.warmup_loaded()
+    elif settings.WORKER_PRELOAD_MODELS:
+        model_registry.load_all()
+    _report_memory(force=True)
+
+
+_memory_reported_at = 0.0
+
+
+def _report_memory(force: bool = False) -> None:
+    """Child'ın unique (USS) / paylaşılan bellek gauge'larını en fazla WORKER_MEMORY_REPORT_SECONDS'ta bir güncelle."""
+    global _memory_reported_at
+    now = time.monotonic()
+    if not force and now - _memory_reported_at < settings.WORKER_MEMORY_REPORT_SECONDS:
+        return
+    _memory_reported_at = now
+    memory = record_process_memory()
+    if force and memory:
+        logger.info(
+            f"Worker child {os.getpid()} memory: uss={memory['uss'] / 1024 / 1024:.0f} MB "
+            f"pss={memory['pss'] / 1024 / 1024:.0f} MB shared={memory['shared'] / 1024 / 1024:.0f} MB"
+        )
+
+
+@task_prerun.connect
+def set_task_context(task=None, **kwargs):
+    """Query log'larında çağıran task görünsün."""
+    current_endpoint.set(f"task:{task.name}")
+
+
+@task_postrun.connect
+def report_worker_memory(**kwargs):
+    """Inference sırasında yazılan (copy-on-write ile kopyalanan) sayfalar USS'te görünsün."""
+    _report_memory()
+
+
+@worker_process_shutdown.connect
+def cleanup_worker_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
 
-# Configure Celery
-celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
-    timezone='UTC',
-    enable_utc=True,
-    task_default_retry_delay=60,  # 1 minute
-    task_max_retries=3,
-    # Prevent duplicate task execution
-    task_reject_on_worker_lost=True,
-    task_acks_late=True,
-)
 
 @celery_app.task(bind=True)
 def summarize_note_task(self, note_id: int):
@@ -36,11 +121,13 @@ def summarize_note_task(self, note_id: int):
     Background task to summarize a note
     Includes retry mechanism and idempotency
     """
-    db: Session = next(get_db())
+    db: Session = SessionLocal()
+    timer = StageTimer()
 
     try:
         # Get note from database
-        note = db.query(Note).filter(Note.id == note_id).first()
+        with timer.stage("db_fetch"):
+            note = db.query(Note).filter(Note.id == note_id).first()
         if not note:
             logger.error(f"Note with id {note_id} not found")
             return {"error": "Note not found", "note_id": note_id}
@@ -56,34 +143,29 @@ def summarize_note_task(self, note_id: int):
             }
 
         # Update status to processing
-        note.status = "processing"
-        note.error_message = None
-        db.commit()
+        with timer.stage("status_update"):
+            note.status = "processing"
+            note.error = None
+            db.commit()
 
         logger.info(f"Starting summarization for note {note_id}")
 
-        # Initialize summarization service
-        summarize_service = SummarizeService()
-
-        # Simulate some processing time (optional)
-        time.sleep(2)
-
-        # Generate summary
-        summary = summarize_service.summarize_text(note.content)
+        # Generate summary (cache first; tokenize / generate stages are timed by the service)
+        summary, model_name = summarize_contents([note.content], timer)[0]
 
         if summary:
             # Update note with summary and mark as completed
-            note.summary = summary
-            note.status = "completed"
-            note.error_message = None
-
-            db.commit()
+            with timer.stage("write_back"):
+                write_summary(note, summary, model_name)
+                db.commit()
+            timer.observe("summarize_note", note_id=note_id)
             logger.info(f"Successfully summarized note {note_id}")
 
             return {
                 "note_id": note_id,
                 "status": "completed",
-                "summary": summary
+                "summary": summary,
+                "model": model_name
             }
         else:
             raise Exception("Failed to generate summary")
@@ -96,7 +178,7 @@ def summarize_note_task(self, note_id: int):
             note = db.query(Note).filter(Note.id == note_id).first()
             if note:
                 note.status = "failed"
-                note.error_message = str(exc)
+                note.error = str(exc)
                 db.commit()
         except Exception as db_exc:
             logger.error(f"Failed to update note status: {db_exc}")
@@ -114,4 +196,254 @@ def summarize_note_task(self, note_id: int):
         }
 
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@celery_app.task(bind=True)
+def flush_summarize_batch(self, fanout: int = 1):
+    """
+    Claim one batch of buffered note IDs and summarize them together.
+    The IDs stay in a processing list under this task's id until the batch
+    is handled, so a redelivery after a worker crash (acks_late) resumes them.
+    `fanout` > 1: a bulk push sent a single message for several full batches;
+    the sibling flushes are dispatched from here, off the API request path.
+    """
+    if fanout > 1:
+        group(flush_summarize_batch.si() for _ in range(fanout - 1)).apply_async()
+    note_ids = summarize_batcher.claim_batch(self.request.id)
+    try:
+        if not note_ids:
+            return {"processed": 0}
+        return summarize_notes_batch(note_ids)
+    finally:
+        summarize_batcher.release(self.request.id)
+        summarize_batcher.reschedule_if_pending()
+
+
+summarize_batcher = SummarizeBatcher(
+    redis_factory=get_redis,
+    flush=lambda countdown, batches: flush_summarize_batch.apply_async(kwargs={"fanout": batches}, countdown=countdown),
+)
+
+summary_cache = SummaryCache(redis_factory=get_redis)
+
+
+def publish_summarize_tasks(note_ids: list) -> None:
+    """One summarize_note_task per note, all published over a single broker connection."""
+    with celery_app.producer_or_acquire() as producer:
+        for note_id in note_ids:
+            summarize_note_task.apply_async((note_id,), producer=producer)
+
+
+# outbox_dispatcher.py: tek notlar interaktif kuyruğa, bulk / deferred notlar batcher'a (tek Redis pipeline)
+outbox_dispatcher = OutboxDispatcher(
+    session_factory=SessionLocal,
+    publishers={INTERACTIVE_QUEUE: publish_summarize_tasks, BULK_QUEUE: summarize_batcher.add},
+)
+
+
+def summarize_contents(contents: list, timer: StageTimer) -> list:
+    """
+    Summarize note contents, serving repeated content from the summary cache.
+    Each content is routed to a model tier by token count; identical contents
+    within one call are summarized only once.
+    Returns (summary, model_name) pairs in input order.
+    """
+    with timer.stage("route"):
+        models = [model_registry.route(content) for content in contents]
+    params = generation_params()
+    keys = [summary_cache.key(content, model, params) for content, model in zip(contents, models)]
+
+    with timer.stage("cache_lookup"):
+        results = {key: (summary_cache.get(key), model) for key, model in zip(keys, models)}
+
+    misses = {}
+    for key, content, model in zip(keys, contents, models):
+        if results[key][0] is None:
+            misses.setdefault(model, {})[key] = content
+
+    for model, by_key in misses.items():
+        # Process-level model (loaded once in worker_process_init)
+        service = get_summarize_service(model)
+        texts = list(by_key.values())
+        if len(texts) == 1:
+            generated = [service.summarize_text(texts[0], timer=timer)]
+        else:
+            generated = service.summarize_batch(texts, timer=timer)
+
+        for key, (summary, used_model) in zip(by_key, generated):
+            results[key] = (summary, used_model)
+            # rule-based fallback output (model not loaded or inference failed) is not cached
+            if used_model != RULE_BASED_MODEL:
+                summary_cache.set(key, summary)
+
+    return [results[key] for key in keys]
+
+
+def write_summary(note: Note, summary: str, model_name: str) -> None:
+    """
+    Store a summary together with its source: the content hash and the model
+    version it was generated from. Rule-based output gets neither, so a
+    backfill replaces it once the model works.
+    """
+    rule_based = model_name == RULE_BASED_MODEL
+    note.summary = summary
+    note.summary_model = model_name
+    note.summary_content_hash = None if rule_based else content_hash(note.content)
+    note.summary_version = None if rule_based else summary_version(model_name)
+    note.status = "completed"
+    note.error = None
+
+
+def summary_is_current(note: Note) -> bool:
+    """The summary was generated from this content by the model version the note routes to today."""
+    return (
+        bool(note.summary)
+        and note.summary_content_hash == content_hash(note.content)
+        and note.summary_version == summary_version(model_registry.route(note.content))
+    )
+
+
+def summarize_notes_batch(note_ids: list) -> dict:
+    """
+    Summarize a batch of notes with one padded forward pass per batch and
+    write all results back in a single transaction.
+    Notes that could not be summarized are marked failed individually.
+    """
+    db: Session = SessionLocal()
+    timer = StageTimer()
+
+    try:
+        with timer.stage("db_fetch"):
+            notes = db.query(Note).filter(Note.id.in_(note_ids)).all()
+        # idempotency: completed notes are skipped
+        notes = [note for note in notes if note.status != "completed"]
+        if not notes:
+            return {"processed": 0}
+
+        with timer.stage("status_update"):
+            for note in notes:
+                note.status = "processing"
+                note.error = None
+            db.commit()
+
+        logger.info(f"Starting batched summarization for {len(notes)} notes")
+        summaries = summarize_contents([note.content for note in notes], timer)
+
+        completed = 0
+        with timer.stage("write_back"):
+            for note, (summary, model_name) in zip(notes, summaries):
+                if summary:
+                    write_summary(note, summary, model_name)
+                    completed += 1
+                else:
+                    note.status = "failed"
+                    note.error = "Failed to generate summary"
+            db.commit()
+        timer.observe("summarize_batch", batch_size=len(notes))
+
+        logger.info(f"Batched summarization finished: {completed}/{len(notes)} completed")
+        return {"processed": len(notes), "completed": completed, "failed": len(notes) - completed}
+
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Batched summarization failed, re-queuing notes individually: {exc}")
+        # Per-note isolation: fall back to the single-note task with its own retries,
+        # on the bulk queue so a failed bulk batch does not jump ahead of interactive notes,
+        # and with the batch priority: the task's own route (0) would put it ahead of
+        # every flush / backfill waiting on the bulk queue
+        flush_route = settings.CELERY_TASK_ROUTES.get(flush_summarize_batch.name)
+        priority = flush_route.priority if flush_route else BULK_REQUEUE_PRIORITY
+        for note_id in note_ids:
+            summarize_note_task.apply_async((note_id,), queue=BULK_QUEUE, priority=priority)
+        return {"error": str(exc), "requeued": len(note_ids)}
+
+    finally:
+        db.close()
+
+
+@celery_app.task
+def backfill_summaries(note_ids: list):
+    """
+    backfill.py: model / parametre değişikliğinden sonra notları yeniden özetle.
+    - Özeti içerik hash'i ve güncel model sürümüyle zaten eşleşen notlar atlanır.
+    - Sadece completed / failed notlar; diğerleri normal özetleme yolunda.
+    - Model yüklenemez ya da inference hata verirse (rule-based fallback) not hiç
+      yazılmaz: mevcut özet ve sürüm damgası kalır, not sonraki backfill'de yine seçilir.
+    bulk kuyruğunda en düşük öncelikle çalışır (CELERY_TASK_ROUTES).
+    """
+    db: Session = SessionLocal()
+    timer = StageTimer()
+    try:
+        with timer.stage("db_fetch"):
+            notes = db.query(Note).filter(Note.id.in_(note_ids), Note.status.in_(BACKFILL_STATUSES)).all()
+        stale = [note for note in notes if not summary_is_current(note)]
+        skipped = len(notes) - len(stale)
+        BACKFILL_NOTES.labels(result="skipped").inc(skipped)
+        if not stale:
+            return {"summarized": 0, "skipped": skipped}
+
+        summaries = summarize_contents([note.content for note in stale], timer)
+        summarized = fallback = 0
+        with timer.stage("write_back"):
+            for note, (summary, model_name) in zip(stale, summaries):
+                if model_name == RULE_BASED_MODEL:
+                    fallback += 1
+                elif summary:
+                    write_summary(note, summary, model_name)
+                    summarized += 1
+            db.commit()
+        timer.observe("backfill_summaries", batch_size=len(stale))
+
+        failed = len(stale) - summarized - fallback
+        BACKFILL_NOTES.labels(result="summarized").inc(summarized)
+        BACKFILL_NOTES.labels(result="fallback").inc(fallback)
+        BACKFILL_NOTES.labels(result="failed").inc(failed)
+        return {"summarized": summarized, "skipped": skipped, "fallback": fallback, "failed": failed}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def reconcile_note_status_counts():
+    """
+    note_status_counts sayaçlarını notes tablosundan yeniden hesaplayıp sapmaları düzeltir.
+    Celery beat ile NOTE_STATS_RECONCILE_SECONDS aralıkla çalışır.
+    """
+    db: Session = SessionLocal()
+    try:
+        corrected = reconcile_status_counts(db)
+        logger.info(f"note_status_counts reconciled, {corrected} rows corrected")
+        return {"corrected": corrected}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def release_deferred_notes():
+    """
+    Admission control'ün beklettiği (deferred) notları, özetleme backlog'u
+    SUMMARIZE_BACKLOG_RESUME altına inince kullanıcı başına sırayla kuyruğa alır
+    (outbox üzerinden; yayını outbox dispatcher yapar).
+    Celery beat ile DEFERRED_RELEASE_SECONDS aralıkla çalışır.
+    """
+    capacity = admission_controller.release_capacity()
+    if not capacity:
+        return {"released": 0}
+
+    db: Session = SessionLocal()
+    try:
+        note_ids = release_deferred(db, capacity)
+        logger.info(f"Released {len(note_ids)} deferred notes")
+        return {"released": len(note_ids)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
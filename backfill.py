@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Re-summarization Backfill Entry Point
+Re-summarizes existing notes after a model or generation parameter change,
+throttled, on the bulk queue at the lowest priority. Resumable: running the
+same command again continues from the last checkpoint.
+Run with:
+    python backfill.py --created-from 2026-01-01 --model facebook/bart-large-cnn
+    python backfill.py --user-id <uuid> --status completed --rate 50
+    python backfill.py --dry-run
+"""
+import argparse
+import logging
+import signal
+import threading
+from datetime import datetime
+from uuid import UUID
+
+from app.config.db import SessionLocal
+from app.config.redis_client import get_redis
+from app.services.admission_service import backlog_pipeline
+from app.services.backfill_service import BACKFILL_STATUSES, BackfillCheckpoint, BackfillFilter, BackfillRunner
+from app.tasks import backfill_summaries
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-summarize notes after a model upgrade")
+    parser.add_argument("--status", nargs="+", default=list(BACKFILL_STATUSES), choices=BACKFILL_STATUSES)
+    parser.add_argument("--created-from", type=datetime.fromisoformat, help="inclusive, ISO 8601")
+    parser.add_argument("--created-to", type=datetime.fromisoformat, help="exclusive, ISO 8601")
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--model", nargs="+", default=[], help="only notes summarized by these models")
+    parser.add_argument(
+        "--include-current", action="store_true",
+        help="also notes already summarized by a current model version (e.g. after changing tier thresholds)",
+    )
+    parser.add_argument("--batch-size", type=int, help="notes per task (BACKFILL_BATCH_SIZE)")
+    parser.add_argument("--rate", type=float, help="notes enqueued per second (BACKFILL_RATE)")
+    parser.add_argument("--restart", action="store_true", help="discard the checkpoint of this filter")
+    parser.add_argument("--dry-run", action="store_true", help="only count the matching notes")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = parse_args()
+    backfill_filter = BackfillFilter(
+        statuses=tuple(args.status),
+        created_from=args.created_from,
+        created_to=args.created_to,
+        user_id=args.user_id,
+        models=tuple(args.model),
+        include_current=args.include_current,
+    )
+    checkpoint = BackfillCheckpoint(get_redis, backfill_filter.name)
+    if args.restart:
+        checkpoint.clear()
+
+    runner = BackfillRunner(
+        session_factory=SessionLocal,
+        enqueue=lambda note_ids: backfill_summaries.apply_async((note_ids,)),
+        backlog=lambda: sum(backlog_pipeline(get_redis()).execute()),
+        checkpoint=checkpoint,
+        batch_size=args.batch_size,
+        rate=args.rate,
+    )
+    if args.dry_run:
+        after, enqueued = checkpoint.load()
+        print(f"{runner.remaining(backfill_filter, after)} notes to enqueue ({enqueued} already enqueued)")
+    else:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        runner.run(backfill_filter, stop)
@@ -0,0 +1,91 @@
+"""
+Auth overhead per request: token verification with and without the
+verified-token cache, for HS256 / RS256 / EdDSA, plus the whole
+get_current_user dependency when the principal is cached.
+
+Keys are generated into a temp dir; no database or Redis round trips are
+made (the principal is served from the in-process layer).
+
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from app.config.settings import settings
+from app.dependencies import get_current_user
+from app.services import token_service
+from app.services.principal_service import Principal, principal_cache
+
+
+def write_key(directory: str, name: str, private_key) -> str:
+    path = os.path.join(directory, f"{name}.pem")
+    with open(path, "wb") as f:
+        f.write(private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return path
+
+
+def configure(algorithm: str, key_file: str = None) -> None:
+    settings.JWT_ALGORITHM = algorithm
+    settings.JWT_PRIVATE_KEY_FILE = key_file
+    settings.JWT_KEY_ID = f"bench-{algorithm.lower()}" if key_file else None
+    token_service._verified.clear()
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def per_call_async_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    settings.JWT_SECRET_KEY = settings.JWT_SECRET_KEY or "bench-secret"
+    principal_cache.use_redis = False
+    user_id = uuid.uuid4()
+    principal_cache.local.set(user_id, Principal(id=user_id, role="user"))
+
+    with tempfile.TemporaryDirectory() as keys:
+        setups = {
+            "HS256": None,
+            "RS256": write_key(keys, "rs256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+            "EdDSA": write_key(keys, "ed25519", ed25519.Ed25519PrivateKey.generate()),
+        }
+
+        print(f"{'alg':<6} {'sign us':>9} {'verify us':>10} {'cached us':>10} {'dependency us':>14}")
+        for algorithm, key_file in setups.items():
+            configure(algorithm, key_file)
+            token = token_service.create_access_token({"sub": str(user_id)})
+            sign = per_call_us(lambda: token_service.create_access_token({"sub": str(user_id)}), args.iterations // 10)
+
+            settings.JWT_VERIFY_CACHE_ENABLED = False
+            verify = per_call_us(lambda: token_service.verify_access_token(token), args.iterations // 10)
+
+            settings.JWT_VERIFY_CACHE_ENABLED = True
+            cached = per_call_us(lambda: token_service.verify_access_token(token), args.iterations)
+            dependency = asyncio.run(per_call_async_us(lambda: get_current_user(token, db=None), args.iterations))
+
+            print(f"{algorithm:<6} {sign:>9.1f} {verify:>10.1f} {cached:>10.1f} {dependency:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare summarization backends on a fixed local corpus:
+latency, peak RSS and ROUGE drift against the fp32 torch baseline.
+
+Each backend runs in its own subprocess so peak RSS is not shared.
+Run from the project root (needs the same env vars as the worker):
+    python -m benchmarks.bench_backends --backends torch torch-int8 onnx
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "summarize_corpus.json")
+
+
+def run_backend(backend: str) -> dict:
+    """Runs inside the child process."""
+    from app.services.summarize_service import SummarizeService
+
+    with open(CORPUS_PATH) as f:
+        corpus = json.load(f)
+
+    started = time.perf_counter()
+    service = SummarizeService(backend=backend)
+    if service.backend is None:
+        raise SystemExit(f"backend {backend} failed to load")
+    load_seconds = time.perf_counter() - started
+
+    service.summarize_text(corpus[0])  # warm-up
+    latencies, summaries = [], []
+    for text in corpus:
+        started = time.perf_counter()
+        summary, _ = service.summarize_text(text)
+        summaries.append(summary)
+        latencies.append(time.perf_counter() - started)
+
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "summaries": summaries,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _lcs(a: list, b: list) -> int:
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _f1(overlap: int, candidate: int, reference: int) -> float:
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge(candidate: str, reference: str) -> tuple:
+    """ROUGE-1 and ROUGE-L F1 on lowercased whitespace tokens."""
+    c, r = candidate.lower().split(), reference.lower().split()
+    if not c or not r:
+        return 0.0, 0.0
+    unigram_overlap = sum(min(c.count(token), r.count(token)) for token in set(c))
+    return _f1(unigram_overlap, len(c), len(r)), _f1(_lcs(c, r), len(c), len(r))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child)))
+        return
+
+    results = {}
+    for backend in dict.fromkeys(["torch", *args.backends]):
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_backends", "--child", backend],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<11} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    baseline = results.get("torch")
+    print(f"{'backend':<11} {'load':>6} {'p50':>6} {'mean':>6} {'peak RSS':>9} {'R1 drift':>9} {'RL drift':>9}")
+    for backend, result in results.items():
+        r1, rl = 1.0, 1.0
+        if baseline:
+            scores = [rouge(c, r) for c, r in zip(result["summaries"], baseline["summaries"])]
+            r1 = statistics.mean(s[0] for s in scores)
+            rl = statistics.mean(s[1] for s in scores)
+        print(
+            f"{backend:<11} {result['load_seconds']:5.1f}s "
+            f"{statistics.median(result['latencies']):5.2f}s {statistics.mean(result['latencies']):5.2f}s "
+            f"{result['peak_rss_mb']:7.0f}MB {1 - r1:9.3f} {1 - rl:9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Summarization throughput (notes/second) for different batch sizes.
+
+Run from the project root (needs the same env vars as the worker):
+    python -m benchmarks.bench_batch_throughput --notes 64 --batch-sizes 1 4 8 16 32
+"""
+import argparse
+import random
+import time
+
+from app.services.model_registry import ModelRegistry
+
+SENTENCES = [
+    "The customer asked for a revised quote for the enterprise plan.",
+    "We discussed the integration timeline with their IT department.",
+    "They reported two bugs in the mobile application last week.",
+    "The contract renewal is due at the end of the quarter.",
+    "Marketing will prepare a case study after the pilot is completed.",
+    "Their procurement team requires an updated security questionnaire.",
+    "A demo of the reporting module was scheduled for Thursday.",
+    "Pricing concerns were raised about the additional user licenses.",
+]
+
+
+def make_notes(n: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(SENTENCES, k=rng.randint(3, 12))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    service = ModelRegistry().load()
+    notes = make_notes(args.notes)
+
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        for i in range(0, len(notes), batch_size):
+            service.summarize_batch(notes[i:i + batch_size], batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"batch_size={batch_size:<3} {len(notes) / elapsed:6.2f} notes/s ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+POST /notes/bulk latency at 10, 1k and 10k notes per request.
+
+Runs the app in-process (ASGI transport, so no HTTP server is needed) and
+compares the JSON body and the streamed NDJSON body with the previous
+implementation, replayed directly on a session: one ORM add per note,
+commit, then one refresh SELECT per note. Summarization is queued for real,
+so Redis must be reachable.
+
+    alembic upgrade head
+    python -m benchmarks.bench_bulk_insert --sizes 10 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from app.config.db import AsyncSessionLocal
+from app.main import app
+from app.models.note_model import Note
+from app.models.user_model import User
+from app.services.token_service import create_access_token
+from benchmarks.bench_batch_throughput import make_notes
+
+BENCH_EMAIL = "bulk-bench@example.com"
+
+
+async def bench_user() -> User:
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        if user is None:
+            user = User(id=uuid.uuid4(), email=BENCH_EMAIL, password="x", role="user")
+            db.add(user)
+            await db.commit()
+        return user
+
+
+def payload(size: int) -> list:
+    return [{"title": f"Bulk bench {i}", "content": content} for i, content in enumerate(make_notes(size))]
+
+
+async def legacy_insert(user: User, notes: list) -> None:
+    async with AsyncSessionLocal() as db:
+        created = [Note(user_id=user.id, title=n["title"], content=n["content"], status="queued") for n in notes]
+        db.add_all(created)
+        await db.commit()
+        for note in created:
+            await db.refresh(note)
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    user = await bench_user()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600) as client:
+        async def post_json(notes):
+            response = await client.post("/notes/bulk", json={"notes": notes}, headers=headers)
+            response.raise_for_status()
+
+        async def post_ndjson(notes):
+            body = "\n".join(json.dumps(note) for note in notes).encode()
+
+            async def chunks():
+                for start in range(0, len(body), 64 * 1024):
+                    yield body[start:start + 64 * 1024]
+
+            response = await client.post(
+                "/notes/bulk", content=chunks(), headers={**headers, "Content-Type": "application/x-ndjson"}
+            )
+            response.raise_for_status()
+
+        await post_json(payload(1))  # warm up connections / first request
+        print(f"{'notes':>7} {'path':<8} {'median ms':>10} {'notes/s':>10}")
+        for size in args.sizes:
+            notes = payload(size)
+            for name, run in (
+                ("legacy", lambda: legacy_insert(user, notes)),
+                ("json", lambda: post_json(notes)),
+                ("ndjson", lambda: post_ndjson(notes)),
+            ):
+                median = await timed(run, args.repeat)
+                print(f"{size:>7} {name:<8} {median:>10.1f} {size / (median / 1000):>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Memory profile of GET /notes/export on a large export.
+
+Seeds --notes rows for a throwaway user, starts the API with uvicorn in a
+subprocess and streams the export over HTTP while sampling the server's RSS
+from /proc. Memory must stay flat: the script exits non-zero if RSS grows by
+more than --max-growth-mb over the run.
+
+    alembic upgrade head
+    python -m benchmarks.bench_export_memory --notes 1000000 --format ndjson csv
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import func, select, text
+
+from app.config.db import SessionLocal
+from app.models.note_model import Note
+from app.models.user_model import User
+from app.services.token_service import create_access_token
+from benchmarks.bench_batch_throughput import SENTENCES
+
+BENCH_EMAIL = "export-bench@example.com"
+
+
+def seed(notes: int) -> uuid.UUID:
+    db = SessionLocal()
+    try:
+        user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        if user is None:
+            user = User(id=uuid.uuid4(), email=BENCH_EMAIL, password="x", role="user")
+            db.add(user)
+            db.commit()
+
+        existing = db.scalar(select(func.count()).select_from(Note).where(Note.user_id == user.id))
+        if existing < notes:
+            print(f"seeding {notes - existing} notes ...")
+            db.execute(
+                text("""
+                    INSERT INTO notes (id, user_id, title, content, summary, status, created_at)
+                    SELECT gen_random_uuid(), :user_id, 'Export note ' || g,
+                           (CAST(:sentences AS text[]))[1 + g % :n_sentences] || ' ' ||
+                           (CAST(:sentences AS text[]))[1 + (g / 7) % :n_sentences],
+                           'Seeded summary ' || g, 'completed', now() - (g || ' seconds')::interval
+                    FROM generate_series(:start, :stop) AS g
+                """),
+                {"user_id": user.id, "sentences": SENTENCES, "n_sentences": len(SENTENCES),
+                 "start": existing + 1, "stop": notes},
+            )
+            db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def profile_export(url: str, headers: dict, pid: int, params: dict, samples: int = 10) -> dict:
+    baseline = rss_mb(pid)
+    peak, received, lines = baseline, 0, 0
+    checkpoints = []
+    started = time.perf_counter()
+    with httpx.stream("GET", f"{url}/notes/export", params=params, headers=headers, timeout=None) as response:
+        response.raise_for_status()
+        next_sample = 0
+        for chunk in response.iter_raw():
+            received += len(chunk)
+            lines += chunk.count(b"\n")  # meaningless for gzip bodies
+            if received >= next_sample:
+                current = rss_mb(pid)
+                peak = max(peak, current)
+                checkpoints.append(round(current, 1))
+                next_sample = received + max(1, 256 * 1024 * 1024 // samples)
+    elapsed = time.perf_counter() - started
+    return {
+        "baseline_mb": baseline,
+        "peak_mb": max(peak, rss_mb(pid)),
+        "received_mb": received / 1024 / 1024,
+        "lines": lines,
+        "seconds": elapsed,
+        "rss_samples": checkpoints[:samples],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--format", nargs="+", default=["ndjson", "csv"], choices=["ndjson", "csv"])
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--max-growth-mb", type=float, default=64.0)
+    args = parser.parse_args()
+
+    user_id = seed(args.notes)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    port = free_port()
+    server = start_server(port)
+    url = f"http://127.0.0.1:{port}"
+
+    failed = False
+    try:
+        # first request pays for imports / pool creation; keep it out of the baseline
+        httpx.get(f"{url}/notes/export", params={"created_to": "1970-01-02T00:00:00Z"}, headers=headers).raise_for_status()
+        for fmt in args.format:
+            result = profile_export(url, headers, server.pid, {"format": fmt, "gzip": str(args.gzip).lower()})
+            growth = result["peak_mb"] - result["baseline_mb"]
+            failed |= growth > args.max_growth_mb
+            print(
+                f"{fmt:<7} lines={'gzip' if args.gzip else result['lines']:>9} {result['received_mb']:>8.1f} MB in {result['seconds']:>6.1f}s "
+                f"rss {result['baseline_mb']:.1f} -> peak {result['peak_mb']:.1f} MB (+{growth:.1f}) "
+                f"{'FAIL' if growth > args.max_growth_mb else 'ok'}"
+            )
+            print(f"        rss samples: {result['rss_samples']}")
+    finally:
+        server.terminate()
+        server.wait()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
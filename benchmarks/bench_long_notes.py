@@ -0,0 +1,49 @@
+"""
+Latency and chunk count of token-aware map-reduce summarization by note length.
+
+Run from the project root (needs the same env vars as the worker):
+    python -m benchmarks.bench_long_notes --lengths 1000 10000 100000
+"""
+import argparse
+import time
+
+from app.services.metrics_service import StageTimer
+from app.services.model_registry import ModelRegistry
+from benchmarks.bench_batch_throughput import SENTENCES
+
+
+def make_note(length: int) -> str:
+    text = ""
+    i = 0
+    while len(text) < length:
+        text += SENTENCES[i % len(SENTENCES)] + " "
+        i += 1
+    return text[:length]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    service = ModelRegistry().load()
+
+    for length in args.lengths:
+        note = make_note(length)
+        chunks = len(service._chunk(note))
+        best = float("inf")
+        stages = {}
+        for _ in range(args.repeat):
+            timer = StageTimer()
+            started = time.perf_counter()
+            service.summarize_text(note, timer=timer)
+            elapsed = time.perf_counter() - started
+            if elapsed < best:
+                best, stages = elapsed, timer.durations
+        stage_str = " ".join(f"{name}={seconds:.2f}s" for name, seconds in stages.items())
+        print(f"{length:>7} chars  chunks={chunks:<2} best={best:.2f}s  {stage_str}")
+
+
+if __name__ == "__main__":
+    main()
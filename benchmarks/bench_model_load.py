@@ -0,0 +1,59 @@
+"""
+Per-task latency: model loaded per task (old behaviour) vs. process-level registry.
+
+Run from the project root (needs the same env vars as the worker):
+    python -m benchmarks.bench_model_load --tasks 5
+"""
+import argparse
+import statistics
+import time
+
+from app.services.model_registry import ModelRegistry, WARMUP_TEXT
+from app.services.summarize_service import SummarizeService
+
+NOTE_TEXT = WARMUP_TEXT * 3
+
+
+def per_task_load(n: int) -> list[float]:
+    latencies = []
+    for _ in range(n):
+        started = time.perf_counter()
+        SummarizeService().summarize_text(NOTE_TEXT)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def registry_load(n: int) -> tuple[float, list[float]]:
+    registry = ModelRegistry()
+    started = time.perf_counter()
+    registry.load()
+    startup = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(n):
+        started = time.perf_counter()
+        registry.get().summarize_text(NOTE_TEXT)
+        latencies.append(time.perf_counter() - started)
+    return startup, latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    print(
+        f"{name:<22} mean={statistics.mean(latencies):.2f}s "
+        f"p50={statistics.median(latencies):.2f}s max={max(latencies):.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5)
+    args = parser.parse_args()
+
+    report("before (per task)", per_task_load(args.tasks))
+    startup, latencies = registry_load(args.tasks)
+    print(f"registry startup (load + warm-up): {startup:.2f}s")
+    report("after (registry)", latencies)
+
+
+if __name__ == "__main__":
+    main()
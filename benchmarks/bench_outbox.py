@@ -0,0 +1,113 @@
+"""
+Outbox dispatcher throughput in enqueued notes per second, per batch size,
+against the old path of one `summarize_note_task.delay()` per note.
+
+Seeds --notes queued notes with their outbox rows, then drains them with
+OutboxDispatcher.dispatch_batch. Messages go to a throwaway queue that is
+deleted afterwards, so no worker picks them up. Needs DATABASE_URL and
+REDIS_URL; stop outbox_dispatcher.py first, it would claim the seeded rows.
+Covers the interactive path (one message per note); bulk rows go through the
+batcher's single Redis pipeline and show up in summarize_outbox_dispatched_total.
+
+    alembic upgrade head
+    python -m benchmarks.bench_outbox --notes 5000 --batch-sizes 50 500 2000
+"""
+import argparse
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, func, insert, select
+
+from app.config.celery_config import INTERACTIVE_QUEUE, celery_app, queue_keys
+from app.config.db import SessionLocal
+from app.config.redis_client import get_redis
+from app.models.note_model import Note
+from app.models.summarize_outbox_model import SummarizeOutbox
+from app.models.user_model import User
+from app.services.note_stats_service import status_deltas_upsert
+from app.services.outbox_service import OutboxDispatcher, outbox_insert
+from app.tasks import summarize_note_task
+
+BENCH_EMAIL = "outbox-bench@example.com"
+BENCH_QUEUE = f"bench.outbox.{uuid.uuid4().hex[:8]}"
+
+
+def bench_user_id() -> uuid.UUID:
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+        if user is None:
+            user = User(id=uuid.uuid4(), email=BENCH_EMAIL, password="x", role="user")
+            db.add(user)
+            db.commit()
+        return user.id
+
+
+def seed(user_id: uuid.UUID, count: int) -> list:
+    rows = [{"user_id": user_id, "title": f"Outbox bench {i}", "content": "x" * 40, "status": "queued"} for i in range(count)]
+    with SessionLocal() as db:
+        note_ids = db.scalars(insert(Note).returning(Note.id), rows).all()
+        db.execute(status_deltas_upsert({(user_id, "queued"): len(note_ids)}))
+        db.execute(outbox_insert(note_ids, INTERACTIVE_QUEUE))
+        db.commit()
+    return list(note_ids)
+
+
+def cleanup(user_id: uuid.UUID, note_ids: list) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(Note).where(Note.id.in_(note_ids)))
+        db.execute(status_deltas_upsert({(user_id, "queued"): -len(note_ids)}))
+        db.commit()
+    get_redis().delete(*queue_keys(BENCH_QUEUE))
+
+
+def publish_to_bench_queue(note_ids: list) -> None:
+    with celery_app.producer_or_acquire() as producer:
+        for note_id in note_ids:
+            summarize_note_task.apply_async((note_id,), producer=producer, queue=BENCH_QUEUE)
+
+
+def per_note_delay(note_ids: list) -> float:
+    """Old path: one apply_async per note, each acquiring its own producer."""
+    started = time.perf_counter()
+    for note_id in note_ids:
+        summarize_note_task.apply_async((str(note_id),), queue=BENCH_QUEUE)
+    return len(note_ids) / (time.perf_counter() - started)
+
+
+def drain(batch_size: int) -> float:
+    dispatcher = OutboxDispatcher(SessionLocal, {INTERACTIVE_QUEUE: publish_to_bench_queue}, batch_size=batch_size)
+    published = 0
+    started = time.perf_counter()
+    while dispatched := dispatcher.dispatch_batch():
+        published += dispatched
+    return published / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 500, 2000])
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if db.scalar(select(func.count()).select_from(SummarizeOutbox)):
+            sys.exit("summarize_outbox is not empty; run against an idle database")
+
+    user_id = bench_user_id()
+    print(f"{'path':<24} {'notes/s':>9}")
+    note_ids = seed(user_id, args.notes)
+    try:
+        print(f"{'per-note delay (old)':<24} {per_note_delay(note_ids):>9.0f}")
+        for batch_size in args.batch_sizes:
+            if batch_size != args.batch_sizes[0]:
+                with SessionLocal() as db:
+                    db.execute(outbox_insert(note_ids, INTERACTIVE_QUEUE))
+                    db.commit()
+            print(f"{f'outbox batch {batch_size}':<24} {drain(batch_size):>9.0f}")
+    finally:
+        cleanup(user_id, note_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-page latency of keyset (cursor) pagination vs. OFFSET on a large notes table.
+
+Seeds --notes rows for a throwaway user (skipped if the user already has them),
+walks every page with the cursor and reports the latency at checkpoint pages.
+The OFFSET query for the same page is timed next to it.
+
+    alembic upgrade head
+    python -m benchmarks.bench_pagination --notes 1000000 --page-size 100
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import func, select, text
+
+from app.config.db import SessionLocal
+from app.models.note_model import Note
+from app.models.user_model import User
+from app.services.pagination_service import keyset_paginate, page_result
+
+PAGE_ORDER = (Note.created_at, Note.id)
+BENCH_EMAIL = "pagination-bench@example.com"
+
+
+def seed(db, notes: int):
+    user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+    if user is None:
+        user = User(id=uuid.uuid4(), email=BENCH_EMAIL, password="x", role="user")
+        db.add(user)
+        db.commit()
+
+    existing = db.scalar(select(func.count()).select_from(Note).where(Note.user_id == user.id))
+    if existing < notes:
+        print(f"seeding {notes - existing} notes ...")
+        db.execute(
+            text("""
+                INSERT INTO notes (id, user_id, title, content, status, created_at)
+                SELECT gen_random_uuid(), :user_id, 'Bench note ' || g, 'Seeded content for note ' || g,
+                       'completed', now() - (g || ' seconds')::interval
+                FROM generate_series(1, :n) AS g
+            """),
+            {"user_id": user.id, "n": notes - existing},
+        )
+        db.commit()
+        db.execute(text("ANALYZE notes"))
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[1, 10, 100, 1_000, 5_000, 10_000])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = seed(db, args.notes)
+        base = select(Note).where(Note.user_id == user.id)
+        checkpoints = set(args.checkpoints)
+
+        print(f"{'page':>7} {'keyset ms':>10} {'offset ms':>10}")
+        cursor, page = None, 0
+        while True:
+            page += 1
+            started = time.perf_counter()
+            rows = db.scalars(keyset_paginate(base, PAGE_ORDER, cursor, args.page_size)).all()
+            keyset_ms = (time.perf_counter() - started) * 1000
+            _, cursor = page_result(rows, PAGE_ORDER, args.page_size)
+
+            if page in checkpoints:
+                started = time.perf_counter()
+                db.scalars(
+                    base.order_by(Note.created_at.desc(), Note.id.desc())
+                    .offset((page - 1) * args.page_size).limit(args.page_size)
+                ).all()
+                offset_ms = (time.perf_counter() - started) * 1000
+                print(f"{page:>7} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+            db.expunge_all()
+            if cursor is None or page >= max(checkpoints):
+                break
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Rate limiter decision cost: latency of RateLimiter.check (one EVALSHA round
+trip to REDIS_URL) at several concurrency levels, spread over --callers
+buckets. Exits non-zero if p99 exceeds --max-p99-ms.
+
+    python -m benchmarks.bench_rate_limit --decisions 20000 --concurrency 1 32 256
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from app.config.redis_client import get_async_redis
+from app.config.settings import RateLimit
+from app.services.rate_limit_service import RateLimiter
+
+ENDPOINT = "POST /bench/rate-limit"
+
+
+async def run_level(limiter: RateLimiter, limit: RateLimit, decisions: int, concurrency: int, callers: int) -> dict:
+    latencies: list = []
+    limited = 0
+    run = uuid.uuid4().hex[:8]
+
+    async def worker(offset: int):
+        nonlocal limited
+        for i in range(offset, decisions, concurrency):
+            started = time.perf_counter()
+            decision = await limiter.check(ENDPOINT, f"bench:{run}:{i % callers}", limit)
+            latencies.append(time.perf_counter() - started)
+            limited += decision is not None and not decision.allowed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "decisions": len(latencies),
+        "limited": limited,
+        "per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decisions", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--callers", type=int, default=1000)
+    parser.add_argument("--max-p99-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    limiter = RateLimiter(async_redis_factory=get_async_redis, enabled=True)
+    limit = RateLimit(capacity=10, refill_per_second=1)
+    await limiter.check(ENDPOINT, "bench:warmup", limit)  # script load + connection
+
+    failed = False
+    print(f"{'concurrency':>11} {'decisions':>10} {'limited':>8} {'per sec':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        r = await run_level(limiter, limit, args.decisions, concurrency, args.callers)
+        # single-caller latency is the decision cost; under concurrency queueing on one connection shows up too
+        failed |= concurrency == 1 and r["p99_ms"] > args.max_p99_ms
+        print(
+            f"{r['concurrency']:>11} {r['decisions']:>10} {r['limited']:>8} {r['per_second']:>9.0f} "
+            f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
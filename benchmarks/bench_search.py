@@ -0,0 +1,102 @@
+"""
+/notes/search latency: the old leading-wildcard ILIKE path vs. full-text
+(search_vector + GIN) vs. the pg_trgm fallback, at several table sizes.
+
+Notes are seeded for a throwaway user up to each size (admin scope, i.e. the
+whole table, is what gets measured). Every note ends with a unique
+"ticket<N>" token, so there is one selective and a few broad queries.
+
+    alembic upgrade head
+    python -m benchmarks.bench_search --sizes 100000 1000000
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import func, select, text
+
+from app.config.db import SessionLocal
+from app.models.note_model import Note
+from app.models.user_model import User
+from app.services.pagination_service import keyset_paginate
+from app.services.search_service import fulltext_search, trigram_search
+from benchmarks.bench_batch_throughput import SENTENCES
+
+BENCH_EMAIL = "search-bench@example.com"
+QUERIES = ["ticket4242", "procurement", '"contract renewal"', "integraton timline"]
+
+
+def seed(db, notes: int):
+    user = db.scalar(select(User).where(User.email == BENCH_EMAIL))
+    if user is None:
+        user = User(id=uuid.uuid4(), email=BENCH_EMAIL, password="x", role="user")
+        db.add(user)
+        db.commit()
+
+    existing = db.scalar(select(func.count()).select_from(Note).where(Note.user_id == user.id))
+    if existing < notes:
+        print(f"seeding {notes - existing} notes ...")
+        db.execute(
+            text("""
+                INSERT INTO notes (id, user_id, title, content, status, created_at)
+                SELECT gen_random_uuid(), :user_id, 'Call notes ' || g,
+                       array_to_string(ARRAY(
+                           SELECT (CAST(:sentences AS text[]))[1 + floor(random() * :n_sentences)::int]
+                           FROM generate_series(1, 3 + g % 10) WHERE g IS NOT NULL
+                       ), ' ') || ' ticket' || g,
+                       'completed', now() - (g || ' seconds')::interval
+                FROM generate_series(:start, :stop) AS g
+            """),
+            {"user_id": user.id, "sentences": SENTENCES, "n_sentences": len(SENTENCES),
+             "start": existing + 1, "stop": notes},
+        )
+        db.commit()
+        db.execute(text("ANALYZE notes"))
+        db.commit()
+
+
+def ilike_search(query, q: str):
+    """GET /notes/search before the full-text index."""
+    query = query.where(Note.title.ilike(f"%{q}%") | Note.content.ilike(f"%{q}%"))
+    return query, (Note.created_at, Note.id)
+
+
+def time_query(db, search, q: str, repeat: int):
+    query, order = search(select(Note), q)
+    query = keyset_paginate(query, order, None, 10)
+    timings, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(db.execute(query).all())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    searches = {"ilike": ilike_search, "fts": fulltext_search, "trgm": trigram_search}
+    db = SessionLocal()
+    try:
+        for size in args.sizes:
+            seed(db, size)
+            print(f"\n{size} bench notes ({db.scalar(select(func.count()).select_from(Note))} in table)")
+            print(f"{'query':<22} {'path':<6} {'median ms':>10} {'rows':>5}")
+            for q in QUERIES:
+                for name, search in searches.items():
+                    try:
+                        median, rows = time_query(db, search, q, args.repeat)
+                        print(f"{q:<22} {name:<6} {median:>10.2f} {rows:>5}")
+                    except Exception as e:
+                        db.rollback()
+                        print(f"{q:<22} {name:<6} {'n/a':>10}  ({type(e).__name__})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-child memory of prefork children: every child loading its own model copy
+vs. the parent preloading once and the children sharing the weight pages
+copy-on-write (WORKER_PRELOAD_IN_PARENT).
+
+    python -m benchmarks.bench_worker_memory --children 4 --notes 8
+
+For each child: USS (memory only that child holds), shared (pages shared with
+the parent / siblings) and PSS (shared pages split between their users), read
+from /proc/<pid>/smaps_rollup after the child summarized --notes notes.
+"total pss" adds up parent and children: what the worker really costs the host.
+"""
+import argparse
+import multiprocessing
+
+from app.services.metrics_service import process_memory
+from app.services.model_registry import ModelRegistry
+from app.services.worker_sizing import limit_threads
+from benchmarks.bench_batch_throughput import make_notes
+
+MB = 1024 * 1024
+
+
+def _child(registry, notes: list, results, stop):
+    limit_threads(1)
+    if registry.is_loaded():
+        registry.warmup_loaded()
+    else:
+        registry.load()
+    service = registry.get()
+    for note in notes:
+        service.summarize_text(note)
+    results.put(process_memory())
+    stop.wait()  # stay alive until every child is measured: shared pages are counted while siblings exist
+
+
+def run_mode(preload: bool, children: int, notes: list) -> None:
+    registry = ModelRegistry()
+    if preload:
+        registry.preload_for_fork()
+
+    ctx = multiprocessing.get_context("fork")
+    results, stop = ctx.Queue(), ctx.Event()
+    processes = [ctx.Process(target=_child, args=(registry, notes, results, stop)) for _ in range(children)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    parent = process_memory()
+    stop.set()
+    for process in processes:
+        process.join()
+
+    if not parent:
+        print("smaps_rollup is not available on this system")
+        return
+
+    name = "preload" if preload else "per-child"
+    for i, memory in enumerate(measured):
+        print(
+            f"{name:<10} child {i:<3} {memory['uss'] / MB:>8.0f} {memory['shared'] / MB:>8.0f} "
+            f"{memory['pss'] / MB:>8.0f}"
+        )
+    total_pss = parent["pss"] + sum(memory["pss"] for memory in measured)
+    print(f"{name:<10} parent    {parent['uss'] / MB:>8.0f} {parent['shared'] / MB:>8.0f} {parent['pss'] / MB:>8.0f}")
+    print(f"{name:<10} total pss {total_pss / MB:.0f} MB\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--children", type=int, default=4)
+    parser.add_argument("--notes", type=int, default=8)
+    args = parser.parse_args()
+
+    notes = make_notes(args.notes)
+    print(f"{'mode':<10} {'process':<9} {'uss MB':>8} {'shared':>8} {'pss MB':>8}")
+    # per-child önce: preload modeli bu process'te bırakır
+    run_mode(False, args.children, notes)
+    run_mode(True, args.children, notes)
+
+
+if __name__ == "__main__":
+    main()
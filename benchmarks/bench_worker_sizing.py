@@ -0,0 +1,83 @@
+"""
+Summarization throughput per core for different (children x threads)
+splits of the same CPUs, the way a prefork worker runs them: each child is
+a separate process with its own model copy and torch thread pool.
+
+    python -m benchmarks.bench_worker_sizing --notes 64 --configs 1x4 2x2 4x1 4x4
+
+Configurations whose children x threads exceed the available CPUs show the
+cost of oversubscription (the old --concurrency=2 with default torch threads).
+The plan the worker would pick for this machine is printed first.
+"""
+import argparse
+import multiprocessing
+import time
+
+from app.services.model_registry import ModelRegistry
+from app.services.worker_sizing import available_cpus, limit_threads, plan_worker
+from benchmarks.bench_batch_throughput import make_notes
+
+
+def _child(threads: int, notes: list, batch_size: int, ready, start, done):
+    limit_threads(threads)
+    service = ModelRegistry().load()
+    service.summarize_batch(notes[:1])  # warm-up outside the timed part
+    ready.release()
+    start.wait()
+    for i in range(0, len(notes), batch_size):
+        service.summarize_batch(notes[i:i + batch_size], batch_size=batch_size)
+    done.put(len(notes))
+
+
+def run_config(children: int, threads: int, notes: list, batch_size: int) -> float:
+    """Notes/second with `children` processes sharing `notes` evenly."""
+    ctx = multiprocessing.get_context("fork")
+    ready, start, done = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+    shares = [notes[i::children] for i in range(children)]
+    processes = [
+        ctx.Process(target=_child, args=(threads, share, batch_size, ready, start, done))
+        for share in shares
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()  # all models loaded
+
+    started = time.perf_counter()
+    start.set()
+    summarized = sum(done.get() for _ in processes)
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return summarized / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--configs", nargs="+", default=None, help="children x threads, e.g. 2x2")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    plan = plan_worker()
+    print(f"plan: {plan.describe()}")
+
+    configs = args.configs or sorted({
+        f"{plan.max_concurrency}x{plan.threads_per_child}",
+        f"1x{max(1, int(cpus))}",
+        f"{max(1, int(cpus))}x1",
+        f"2x{max(1, int(cpus))}",  # oversubscribed: default torch threads in every child
+    })
+    notes = make_notes(args.notes)
+
+    print(f"{'config':<8} {'threads':>7} {'notes/s':>8} {'notes/s/core':>12}")
+    for config in configs:
+        children, threads = (int(part) for part in config.split("x"))
+        rate = run_config(children, threads, notes, args.batch_size)
+        used = min(cpus, children * threads)
+        print(f"{config:<8} {children * threads:>7} {rate:>8.2f} {rate / used:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
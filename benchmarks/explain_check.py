@@ -0,0 +1,152 @@
+"""
+EXPLAIN-based index regression check for the notes endpoints.
+
+Seeds a large dataset, drives the real endpoints through the ASGI app,
+captures every SQL statement they send, and EXPLAINs each one.
+Exits non-zero if any statement plans a sequential scan on `notes` or `users`.
+
+    alembic upgrade head
+    python -m benchmarks.explain_check --users 1000 --notes-per-user 500
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import event, select, text
+
+from app.config.db import SessionLocal, async_engine
+from app.main import app
+from app.models.user_model import User
+from app.services.token_service import create_access_token
+
+SEED_DOMAIN = "explain-check.example.com"
+CHECKED_TABLES = {"notes", "users"}
+
+
+def seed(users: int, notes_per_user: int) -> None:
+    db = SessionLocal()
+    try:
+        seeded = db.scalar(text("SELECT count(*) FROM users WHERE email LIKE :pattern"), {"pattern": f"%@{SEED_DOMAIN}"})
+        if seeded >= users:
+            return
+        print(f"seeding {users} users x {notes_per_user} notes ...")
+        db.execute(
+            text("""
+                INSERT INTO users (id, email, password, role)
+                SELECT gen_random_uuid(), 'user' || g || '@' || :domain, 'x',
+                       CASE WHEN g = 1 THEN 'admin' ELSE 'user' END
+                FROM generate_series(1, :users) AS g
+            """),
+            {"users": users, "domain": SEED_DOMAIN},
+        )
+        db.execute(
+            text("""
+                INSERT INTO notes (id, user_id, title, content, status, created_at)
+                SELECT gen_random_uuid(), u.id, 'Seeded note ' || g,
+                       'Customer call about renewal, pricing and onboarding ' || g,
+                       (ARRAY['completed','completed','completed','completed','failed','queued','processing'])[1 + g % 7],
+                       now() - (g || ' minutes')::interval
+                FROM users u CROSS JOIN generate_series(1, :per_user) AS g
+                WHERE u.email LIKE :pattern
+            """),
+            {"per_user": notes_per_user, "pattern": f"%@{SEED_DOMAIN}"},
+        )
+        db.commit()
+        db.execute(text("ANALYZE users"))
+        db.execute(text("ANALYZE notes"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def seed_tokens() -> dict:
+    db = SessionLocal()
+    try:
+        admin = db.scalar(select(User).where(User.email == f"user1@{SEED_DOMAIN}"))
+        user = db.scalar(select(User).where(User.email == f"user2@{SEED_DOMAIN}"))
+        token = lambda u: create_access_token({"sub": str(u.id)}, expires_delta=timedelta(minutes=30))
+        return {"admin": token(admin), "user": token(user)}
+    finally:
+        db.close()
+
+
+async def drive_endpoints(tokens: dict) -> None:
+    """Every endpoint that queries notes, as a regular user and as an admin."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check") as client:
+        for role, token in tokens.items():
+            headers = {"Authorization": f"Bearer {token}"}
+            page = (await client.get("/notes/", params={"limit": 50}, headers=headers)).json()
+            await client.get("/notes/", params={"limit": 50, "cursor": page["next_cursor"]}, headers=headers)
+            await client.get("/notes/", params={"status": "queued", "limit": 50}, headers=headers)
+            await client.get("/notes/", params={"status": "completed", "limit": 50}, headers=headers)
+            await client.get("/notes/stats", headers=headers)
+            await client.get("/notes/search", params={"q": "onboarding 42"}, headers=headers)
+            await client.get("/notes/search", params={"q": "renewl"}, headers=headers)  # trigram fallback
+
+            note_id = page["items"][0]["id"]
+            await client.get(f"/notes/{note_id}", headers=headers)
+
+        headers = {"Authorization": f"Bearer {tokens['user']}"}
+        created = (await client.post(
+            "/notes/", json={"title": "Explain", "content": "Explain check throwaway note."}, headers=headers
+        )).json()
+        await client.put(f"/notes/{created['id']}", json={"title": "Explain 2"}, headers=headers)
+        await client.delete(f"/notes/{created['id']}", headers=headers)
+
+
+def seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def explain(statements: list) -> int:
+    failures = 0
+    async with async_engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+            scans = seq_scans(plan)
+            status = "FAIL" if scans else "ok  "
+            failures += bool(scans)
+            print(f"{status} {' '.join(statement.split())[:140]}")
+            if scans:
+                print(f"     seq scan on: {', '.join(scans)}")
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--notes-per-user", type=int, default=500)
+    args = parser.parse_args()
+
+    seed(args.users, args.notes_per_user)
+    tokens = seed_tokens()
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")) and not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    await drive_endpoints(tokens)
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    # Same statement shape only needs one EXPLAIN
+    unique = list({statement: (statement, parameters) for statement, parameters in captured}.values())
+    failures = await explain(unique)
+    print(f"\n{len(unique)} statements checked, {failures} with sequential scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+HTTP load test for the API: requests/second and latency percentiles
+at several concurrency levels against a running server.
+
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 100 500 1000
+
+A throwaway user is created and a few notes are seeded; every client then
+loops over GET /notes/ (override with --path) for --duration seconds.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def authenticate(client: httpx.AsyncClient, seed_notes: int) -> dict:
+    email = f"load-{uuid.uuid4().hex[:10]}@example.com"
+    password = "LoadTest123"
+    await client.post("/auth/signup", json={"email": email, "password": password})
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for i in range(seed_notes):
+        await client.post(
+            "/notes/",
+            json={"title": f"Load note {i}", "content": "Seeded note for the load test run."},
+            headers=headers,
+        )
+    return headers
+
+
+async def run_level(url: str, path: str, headers: dict, concurrency: int, duration: float) -> dict:
+    latencies: list = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/notes/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed-notes", type=int, default=20)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        headers = await authenticate(client, args.seed_notes)
+
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        result = await run_level(args.url, args.path, headers, concurrency, args.duration)
+        print(
+            f"{result['concurrency']:>8} {result['requests']:>9} {result['errors']:>7} "
+            f"{result['rps']:>9.1f} {result['p50'] * 1000:>8.1f} {result['p99'] * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
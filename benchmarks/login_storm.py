@@ -0,0 +1,84 @@
+"""
+Note endpoint latency under a login storm, against a running server.
+
+Measures GET /notes/ p50/p99 alone, then again while --login-clients
+loop on POST /auth/login (each one a bcrypt verify). With hashing in the
+password process pool the note p99 should barely move; 503s returned by
+the login loops (pool queue full) are counted separately.
+
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.login_storm --url http://127.0.0.1:8000 --login-clients 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks.load_test import authenticate, run_level
+
+
+async def login_storm(url: str, clients: int, stop: asyncio.Event) -> dict:
+    email = f"storm-{uuid.uuid4().hex[:10]}@example.com"
+    password = "LoginStorm123"
+    counts = {"ok": 0, "busy": 0, "errors": 0}
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        await client.post("/auth/signup", json={"email": email, "password": password})
+
+        async def worker():
+            while not stop.is_set():
+                try:
+                    response = await client.post("/auth/login", json={"email": email, "password": password})
+                    if response.status_code == 200:
+                        counts["ok"] += 1
+                    elif response.status_code == 503:
+                        counts["busy"] += 1
+                        await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+                    else:
+                        counts["errors"] += 1
+                except httpx.HTTPError:
+                    counts["errors"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return counts
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/notes/")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--login-clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        headers = await authenticate(client, seed_notes=20)
+
+    baseline = await run_level(args.url, args.path, headers, args.concurrency, args.duration)
+
+    stop = asyncio.Event()
+    storm = asyncio.create_task(login_storm(args.url, args.login_clients, stop))
+    await asyncio.sleep(1)  # login'ler havuzu doldursun
+    started = time.perf_counter()
+    during = await run_level(args.url, args.path, headers, args.concurrency, args.duration)
+    stop.set()
+    logins = await storm
+    logins_per_second = logins["ok"] / (time.perf_counter() - started + 1)
+
+    print(f"{'run':<12} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, r in (("baseline", baseline), ("login storm", during)):
+        print(
+            f"{name:<12} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.0f} "
+            f"{r['p50'] * 1000:>8.1f} {r['p99'] * 1000:>8.1f}"
+        )
+    print(
+        f"logins: {logins['ok']} ok ({logins_per_second:.1f}/s), {logins['busy']} busy (503), "
+        f"{logins['errors']} errors"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,9 +2,28 @@
 """
 Celery Worker Entry Point
 Run with: celery -A celery_worker worker --loglevel=info --concurrency=2
+Dedicated workers per queue (see docker-compose.yml):
+    celery -A celery_worker worker -Q summarize.interactive -n interactive@%h
+    celery -A celery_worker worker -Q summarize.bulk -n bulk@%h
+    celery -A celery_worker worker -Q maintenance -n maintenance@%h
+
+Sized to the container (WORKER_AUTOSIZE): autoscale between min and max
+children from the cgroup CPU / memory limits. Either way, torch threads are
+partitioned per child from the pool's real maximum size (--concurrency or
+the --autoscale maximum), see app.tasks.size_child_threads:
+    python celery_worker.py worker -Q summarize.bulk -n bulk@%h --loglevel=info
 """
+import sys
 
-from app.tasks import celery_app
+from app.config.celery_config import celery_app
+from app.config.settings import settings
+from app.services.worker_sizing import autosize_worker_args, plan_worker
 
 if __name__ == '__main__':
-    celery_app.start()
\ No newline at end of file
+    argv = sys.argv[1:]
+    if settings.WORKER_AUTOSIZE and argv[:1] == ["worker"]:
+        plan = plan_worker()
+        print(f"Worker plan: {plan.describe()}")
+        # child başına thread, worker_init'te gerçek havuz boyutundan hesaplanır (app.tasks)
+        argv = autosize_worker_args(argv, plan)
+    celery_app.start(argv)
@@ -12,7 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.config.settings import settings
 from app.config.db import Base
 # Modeller metadata'ya eklensin diye importla (autogenerate bunları görsün)
-from app.models import user_model, note_model  # noqa: F401
+from app.models import user_model, note_model, note_status_count_model, summarize_outbox_model  # noqa: F401
 
 # Alembic config objesi
 config = context.config
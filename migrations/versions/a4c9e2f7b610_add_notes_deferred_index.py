@@ -0,0 +1,41 @@
+"""add partial index for deferred notes
+
+Revision ID: a4c9e2f7b610
+Revises: f6b2c8d4e317
+Create Date: 2026-10-17 16:05:12.402187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f7b610'
+down_revision: Union[str, Sequence[str], None] = 'f6b2c8d4e317'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFERRED = sa.text("status = 'deferred'")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # release task: per-user row_number() over the deferred notes, already in index order
+    # CONCURRENTLY: notes tablosuna yazmalar build boyunca bloklanmaz (transaction dışında çalışmalı)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notes_deferred_user_id_created_at_id', 'notes',
+            ['user_id', 'created_at', 'id'], unique=False,
+            postgresql_where=DEFERRED, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_notes_deferred_user_id_created_at_id', table_name='notes',
+            postgresql_where=DEFERRED, postgresql_concurrently=True
+        )
@@ -0,0 +1,45 @@
+"""add summarize_outbox table
+
+Revision ID: b8e1d5f3c720
+Revises: a4c9e2f7b610
+Create Date: 2026-10-17 18:20:41.733905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1d5f3c720'
+down_revision: Union[str, Sequence[str], None] = 'a4c9e2f7b610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'summarize_outbox',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('note_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('queue', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # not silinirken CASCADE outbox satırını index ile bulsun
+    op.create_index('ix_summarize_outbox_note_id', 'summarize_outbox', ['note_id'], unique=False)
+    # mevcut queued notların kuyruğa girip girmediği bilinmiyor; tekrar yayınlamak zararsız (task'lar idempotent)
+    op.execute("""
+        INSERT INTO summarize_outbox (note_id, queue)
+        SELECT id, 'summarize.bulk' FROM notes WHERE status = 'queued' ORDER BY created_at, id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_summarize_outbox_note_id', table_name='summarize_outbox')
+    op.drop_table('summarize_outbox')
@@ -0,0 +1,31 @@
+"""add note summary_content_hash and summary_version
+
+Revision ID: c2f6a8d4e915
+Revises: b8e1d5f3c720
+Create Date: 2026-10-17 20:02:17.582461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f6a8d4e915'
+down_revision: Union[str, Sequence[str], None] = 'b8e1d5f3c720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # mevcut özetler için boş: kaynakları bilinmiyor, ilk backfill'de (cache'ten) yeniden yazılırlar
+    op.add_column('notes', sa.Column('summary_content_hash', sa.String(), nullable=True))
+    op.add_column('notes', sa.Column('summary_version', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notes', 'summary_version')
+    op.drop_column('notes', 'summary_content_hash')
@@ -0,0 +1,39 @@
+"""add notes pagination indexes
+
+Revision ID: c4a8f0e2d61b
+Revises: b7d2e4f1a9c3
+Create Date: 2026-10-17 11:02:17.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f0e2d61b'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e4f1a9c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: notes tablosuna yazmalar build boyunca bloklanmaz (transaction dışında çalışmalı)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notes_user_id_created_at_id', 'notes', ['user_id', 'created_at', 'id'], unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_notes_created_at_id', 'notes', ['created_at', 'id'], unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_created_at_id', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_notes_user_id_created_at_id', table_name='notes', postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""add notes query indexes, drop redundant id indexes
+
+Revision ID: d91e3b7c5a20
+Revises: c4a8f0e2d61b
+Create Date: 2026-10-17 11:48:55.120337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91e3b7c5a20'
+down_revision: Union[str, Sequence[str], None] = 'c4a8f0e2d61b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUSES = sa.text("status IN ('queued', 'pending', 'processing')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: notes tablosuna yazmalar build boyunca bloklanmaz (transaction dışında çalışmalı)
+    with op.get_context().autocommit_block():
+        # (user_id, status) filters; created_at, id let status-filtered pages use the same index
+        op.create_index(
+            'ix_notes_user_id_status_created_at_id', 'notes',
+            ['user_id', 'status', 'created_at', 'id'], unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_notes_active_status_created_at_id', 'notes',
+            ['status', 'created_at', 'id'], unique=False,
+            postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True
+        )
+        # primary key indexes already cover these
+        op.drop_index('ix_notes_id', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_users_id', table_name='users', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_id', 'users', ['id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_notes_id', 'notes', ['id'], unique=False, postgresql_concurrently=True)
+        op.drop_index(
+            'ix_notes_active_status_created_at_id', table_name='notes',
+            postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True
+        )
+        op.drop_index('ix_notes_user_id_status_created_at_id', table_name='notes', postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""add note_status_counts counter table
+
+Revision ID: e3f7a9c1b254
+Revises: d91e3b7c5a20
+Create Date: 2026-10-17 13:05:12.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f7a9c1b254'
+down_revision: Union[str, Sequence[str], None] = 'd91e3b7c5a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'note_status_counts',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'status')
+    )
+    # mevcut notlardan ilk sayaçlar
+    op.execute("""
+        INSERT INTO note_status_counts (user_id, status, count)
+        SELECT user_id, status, count(*) FROM notes GROUP BY user_id, status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('note_status_counts')
@@ -0,0 +1,58 @@
+"""add notes full-text search vector and trigram indexes
+
+Revision ID: f6b2c8d4e317
+Revises: e3f7a9c1b254
+Create Date: 2026-10-17 14:22:40.913256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b2c8d4e317'
+down_revision: Union[str, Sequence[str], None] = 'e3f7a9c1b254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(summary, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # stored generated column: tablo bir kez yeniden yazılır (büyük tabloda bakım penceresinde çalıştırın)
+    op.add_column('notes', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=True
+    ))
+    # GIN build'leri uzun sürer: CONCURRENTLY ile yazmalar bloklanmaz (transaction dışında çalışmalı)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notes_search_vector', 'notes', ['search_vector'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_notes_title_trgm', 'notes', ['title'], unique=False,
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_notes_content_trgm', 'notes', ['content'], unique=False,
+            postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'}, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_content_trgm', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_notes_title_trgm', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_notes_search_vector', table_name='notes', postgresql_concurrently=True)
+    op.drop_column('notes', 'search_vector')
+    # pg_trgm extension başka şemalar da kullanıyor olabilir; bırakılır
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Outbox Dispatcher Entry Point
+Publishes the summarization work recorded in summarize_outbox to the broker.
+Run with: python outbox_dispatcher.py
+Several dispatchers may run side by side: rows are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED (OUTBOX_BATCH_SIZE, OUTBOX_POLL_MS).
+"""
+import logging
+import signal
+import threading
+
+from app.config.settings import settings
+from app.services.metrics_service import start_metrics_server
+from app.tasks import outbox_dispatcher
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if settings.OUTBOX_METRICS_PORT:
+        start_metrics_server(settings.OUTBOX_METRICS_PORT)
+    outbox_dispatcher.run(stop)